@@ -1,5 +1,10 @@
 import streamlit as st
 import pandas as pd
+from utils.ingest import excel_sheet_names, read_excel_cached
+from utils.sources import dataset_columns, dataset_files, is_temporal, load_dataset, signature, time_range
+from utils.results import append_data, get_results, reset_results
+from utils.shared_cache import get_shared_cache
+from utils.prefetch import ANALYSES, DEFAULT_ANALYSES, PREFETCH_WORKERS, prefetch
 
 import asyncio
 
@@ -126,28 +131,123 @@ if "selected_column" not in st.session_state:
 st.markdown("<h1 style='text-align: center;'> 📂 Upload Your Dataset </h1>", unsafe_allow_html=True)
 #st.title("")
 
-uploaded_file = st.file_uploader("Upload a CSV or Excel file", type=["csv", "xlsx"])
-
-if uploaded_file is not None:
-    # Load dataset and reset session state
-    if uploaded_file.name.endswith('.csv'):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
-
-    st.session_state.data = df  # Store dataset
-    st.session_state.selected_column = None  # Reset selected column
-
-    st.success("✅ Dataset uploaded successfully! Now select the column containing text data.")
+source = st.radio("Data source", ["Upload a file", "Folder or files on the server"], horizontal=True,
+                  help="Large exports (folders of daily Parquet/CSV shards) can be read straight from disk: "
+                       "only the chosen columns and date range are loaded.")
+
+if source == "Upload a file":
+    uploaded_file = st.file_uploader("Upload a CSV or Excel file", type=["csv", "xlsx"])
+
+    sheet = None
+    if uploaded_file is not None and not uploaded_file.name.endswith('.csv'):
+        sheets = excel_sheet_names(uploaded_file)
+        sheet = st.selectbox("Select the sheet to load", sheets) if len(sheets) > 1 else sheets[0]
+
+    # Append mode: a file that extends the current dataset (e.g. this week's export) is added to it,
+    # and only its rows are analysed; the previous results and summaries are kept and extended
+    current_column = st.session_state.selected_column
+    append = st.session_state.data is not None and current_column is not None and st.checkbox(
+        "➕ Append to the current dataset instead of replacing it", key="append_upload",
+        help=f"The new file needs the **{current_column}** column; other columns are matched by name.")
+
+    upload_id = None if uploaded_file is None else (uploaded_file.file_id, sheet)
+    # A file already rejected for appending is not re-read on every rerun (unless append is turned off)
+    rejected = upload_id is not None and append and st.session_state.get("append_rejected") == upload_id
+    if uploaded_file is not None and st.session_state.get("uploaded_file_id") != upload_id and not rejected:
+        # Load dataset and reset session state (only for a new upload, not on every rerun)
+        if uploaded_file.name.endswith('.csv'):
+            df = pd.read_csv(uploaded_file)
+        else:
+            # Workbooks are converted to Parquet once, keyed by content hash; re-uploads load instantly
+            with st.spinner("Reading workbook..."):
+                df = read_excel_cached(uploaded_file, sheet)
+
+        if append and current_column not in df.columns:
+            st.session_state.append_rejected = upload_id
+            rejected = True
+        elif append:
+            df[current_column] = df[current_column].astype(str)
+            with st.spinner(f"Analysing {len(df):,} new rows..."):
+                data = append_data(df)
+            st.session_state.uploaded_file_id = upload_id
+            st.session_state.append_summary = (len(df), len(data))
+        else:
+            st.session_state.data = df  # Store dataset
+            st.session_state.selected_column = None  # Reset selected column
+            st.session_state.time_column = st.session_state.customer_column = None
+            st.session_state.uploaded_file_id = upload_id
+            st.session_state.append_summary = None
+            reset_results()  # Drop results computed for the previous dataset
+
+    if rejected:
+        st.error(f"❌ Cannot append: the file has no **{current_column}** column.")
+    elif uploaded_file is not None and st.session_state.get("uploaded_file_id") == upload_id:
+        if st.session_state.get("append_summary"):
+            added, total = st.session_state.append_summary
+            st.success(f"✅ Appended **{added:,} rows** · the dataset now has **{total:,} rows**.")
+        else:
+            st.success("✅ Dataset uploaded successfully! Now select the column containing text data.")
+
+else:
+    path = st.text_input("Path, folder or glob (e.g. /data/exports/ or /data/exports/*.parquet)", key="source_path")
+    files = dataset_files(path) if path else []
+    if path and not files:
+        st.warning("⚠️ No .parquet or .csv files found at that path.")
+    elif files:
+        try:
+            schema = dataset_columns(path)
+        except (ValueError, OSError) as e:
+            st.error(f"❌ Could not open the dataset: {e}")
+            schema = {}
+
+        if schema:
+            st.write(f"📁 **{len(files):,} file(s)** · {len(schema)} columns")
+            names = list(schema)
+            optional = ["(none)"] + names
+            col1, col2, col3 = st.columns(3)
+            text_column = col1.selectbox("Text column", names, key="source_text_column")
+            time_column = col2.selectbox("Timestamp column (optional)", optional, key="source_time_column")
+            customer_column = col3.selectbox("Customer ID column (optional)", optional, key="source_customer_column")
+            time_column = None if time_column == "(none)" else time_column
+            customer_column = None if customer_column == "(none)" else customer_column
+
+            start = end = None
+            if time_column:
+                lowest, highest = time_range(path, time_column)
+                lowest, highest = pd.to_datetime(lowest, errors="coerce"), pd.to_datetime(highest, errors="coerce")
+                if pd.notna(lowest) and pd.notna(highest):
+                    dates = st.date_input("Date range", value=(lowest.date(), highest.date()),
+                                          min_value=lowest.date(), max_value=highest.date(), key="source_dates")
+                    start, end = dates if len(dates) == 2 else (dates[0], dates[0])
+                    if not is_temporal(schema[time_column]):
+                        st.caption("Text timestamps: the range is applied while loading unless they are ISO dates.")
+
+            source_id = ("path", signature(files), text_column, time_column, customer_column, start, end)
+            if st.button("Load dataset", key="source_load") and st.session_state.get("uploaded_file_id") != source_id:
+                with st.spinner("Reading the selected columns..."):
+                    df = load_dataset(path, text_column, time_column, customer_column, start, end)
+                st.session_state.data = df
+                st.session_state.selected_column = text_column
+                st.session_state.time_column = time_column
+                st.session_state.customer_column = customer_column
+                st.session_state.uploaded_file_id = source_id
+                reset_results()
+
+            if st.session_state.get("uploaded_file_id") == source_id:
+                st.success(f"✅ Loaded **{len(st.session_state.data):,} rows** from {len(files):,} file(s).")
 
 # If data is uploaded, show column selection dropdown
 if st.session_state.data is not None:
     st.subheader("📌 Select the Text Column")
     columns = st.session_state.data.columns.tolist()
 
-    selected_column = st.selectbox("Choose the column containing reviews, tweets, or comments:", columns)
+    current = st.session_state.selected_column
+    selected_column = st.selectbox("Choose the column containing reviews, tweets, or comments:", columns,
+                                   index=columns.index(current) if current in columns else 0)
 
     if selected_column:
+        if st.session_state.selected_column != selected_column:
+            reset_results()  # Results belong to the previously selected column
         st.session_state.selected_column = selected_column  # Store selected column
         st.session_state.data[selected_column] = st.session_state.data[selected_column].astype(str)  # Convert to string
         st.info(f"✅ Selected Column: **{selected_column}** (Text conversion applied)")
@@ -155,3 +255,40 @@ if st.session_state.data is not None:
         # Show a preview of the selected column
         st.write("📊 **Data Preview:**")
         st.write(st.session_state.data[[selected_column]].head())
+
+        # 🧹 **Near-Duplicate Collapsing** (templated reviews, bot spam)
+        results = get_results()
+        collapse = st.checkbox("🧹 Collapse near-duplicate texts before analysis", value=results.dedup is not None,
+                               help="Groups texts that differ only by a name, order number, etc. (MinHash LSH). "
+                                    "Pages then analyse one text per group and apply the result to every member.")
+        if collapse:
+            threshold = st.slider("Similarity threshold", min_value=0.5, max_value=0.95, step=0.05,
+                                  value=results.dedup.threshold if results.dedup is not None else 0.8)
+            with st.spinner("Finding near-duplicates..."):
+                dedup = results.near_duplicates(threshold)
+            results.set_dedup(dedup)
+            st.info(f"🧹 **{dedup.n_rows:,} rows → {dedup.n_clusters:,} unique texts** · "
+                    f"{dedup.removed_fraction:.0%} less scoring work · largest group: {dedup.weights.max():,} rows")
+        else:
+            results.set_dedup(None)
+
+        # ⚡ **Background Precompute** (opt-in: uses server CPU before the pages are opened)
+        if st.checkbox("⚡ Precompute analyses in the background", key="prefetch",
+                       help=f"Starts the selected analyses now, most-used first, on up to {PREFETCH_WORKERS} CPU core(s). "
+                            "Pages show finished results immediately and wait for running ones instead of starting over."):
+            enabled = st.multiselect("Analyses to precompute", list(ANALYSES), default=DEFAULT_ANALYSES, key="prefetch_analyses")
+            icons = {"ready": "✅", "running": "⏳", "queued": "🕒"}
+            statuses = prefetch(results, enabled)
+            st.caption(" · ".join(f"{icons.get(state, '⚠️')} {name}: {state}" for name, state in statuses.items()))
+
+# ⚙️ **Shared Result Cache** (server-wide: identical uploads are analysed once)
+with st.expander("⚙️ Shared Result Cache"):
+    stats = get_shared_cache().stats()
+    st.write(f"**Entries:** {stats['entries']} · **Memory:** {stats['size_mb']:.1f} / {stats['budget_mb']:.0f} MB")
+    st.write(f"**Hits:** {stats['hits']} · **Misses:** {stats['misses']} · "
+             f"**Hit rate:** {stats['hit_rate']:.0%} · **Evictions:** {stats['evictions']}")
+    st.write(f"**Running now:** {stats['in_flight']} · **Waits on a running computation:** {stats['attached']}")
+    session = st.session_state.get("results")
+    if session is not None:
+        st.write(f"**This session:** {session.memory_usage() / 2**20:.1f} MB in memory "
+                 f"(budget {session.budget_bytes / 2**20:.0f} MB) · {session.spilled_bytes() / 2**20:.1f} MB spilled to disk")
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+# Per-worker start-up cost of the lexicons: parsed from the packages' text files versus
+# opened from the memory-mapped bundle (utils/lexicon_bundle.py).
+#
+#   python -m utils.lexicon_bundle build
+#   python benchmarks/lexicon_startup.py --workers 4
+#
+# Each mode starts a fresh process pool; every worker loads all three lexicons, scores
+# a few texts with them and reports the load time and memory it took (PSS splits
+# shared pages between the processes that map them).
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORKER = r'''
+import sys, json, time
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, {root!r})
+
+
+def memory_kb():
+    fields = {{}}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return fields.get("Rss", 0), fields.get("Pss", 0)
+
+
+def start_worker(mode):
+    from textblob import TextBlob
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    from utils import lexicon_bundle
+    before = memory_kb()  # Modules imported: measure the lexicons only
+    start = time.perf_counter()
+    if mode == "bundle":
+        bundle = lexicon_bundle.open_bundle()
+        vader, pattern, nrc = bundle.vader(), bundle.pattern_sentiment(), bundle.nrc_lexicon()
+    else:
+        vader, pattern, nrc = SentimentIntensityAnalyzer(), lambda text: TextBlob(text).sentiment, lexicon_bundle._nrc_lexicon()
+    for text in ["Love the camera, hate the battery!", "The delivery was late again."]:
+        vader.polarity_scores(text), pattern(text), [nrc.get(word) for word in text.lower().split()]
+    seconds = time.perf_counter() - start
+    after = memory_kb()
+    return {{"seconds": seconds, "rss_mb": (after[0] - before[0]) / 1024, "pss_mb": after[1] / 1024}}
+
+
+if __name__ == "__main__":
+    with ProcessPoolExecutor({workers}) as pool:
+        print(json.dumps(list(pool.map(start_worker, [{mode!r}] * {workers}))))
+'''
+
+
+def run(mode, workers, bundle):
+    env = dict(os.environ)
+    env["SENTIMENT_AI_LEXICON_BUNDLE"] = str(bundle) if mode == "bundle" else str(ROOT / ".no-lexicon-bundle")
+    code = WORKER.format(root=str(ROOT), workers=workers, mode=mode)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    from utils.lexicon_bundle import BUNDLE_PATH
+
+    parser = argparse.ArgumentParser(description="Compare lexicon start-up time and memory per worker.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--bundle", default=str(BUNDLE_PATH))
+    args = parser.parse_args()
+    if not Path(args.bundle).exists():
+        sys.exit(f"{args.bundle} not found; run `python -m utils.lexicon_bundle build` first")
+
+    for mode in ("packages", "bundle"):
+        stats = run(mode, args.workers, args.bundle)
+        mean = {key: sum(s[key] for s in stats) / len(stats) for key in ("seconds", "rss_mb", "pss_mb")}
+        print(f"{mode:9s} load {mean['seconds'] * 1000:7.1f} ms/worker · "
+              f"RSS growth {mean['rss_mb']:6.1f} MB/worker · PSS {mean['pss_mb']:6.1f} MB/worker")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    main()
@@ -0,0 +1,125 @@
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+# Rerun latency of the dashboard pages on a large synthetic dataset.
+#
+#   python benchmarks/rerun_latency.py --rows 100000 --repeats 5
+#   python benchmarks/rerun_latency.py --tree /path/to/older/checkout   # before/after comparison
+#
+# Each scenario loads a page once (warm-up: models are fitted, caches filled), then
+# changes one of its widgets repeatedly. "full rerun" is the wall time of a whole
+# script run, which is what every interaction costs on a page without fragments.
+# When the widget lives in an st.fragment, Streamlit reruns only that function on
+# interaction; AppTest always reruns the whole script, so the harness times the
+# fragment bodies themselves and reports that as "scoped rerun".
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORDS = {
+    "Positive": ["love", "great", "fast", "excellent", "friendly", "fantastic", "recommend"],
+    "Negative": ["late", "broken", "refund", "rude", "crash", "terrible", "slow"],
+    "Neutral": ["order", "package", "app", "delivery", "camera", "battery", "price"],
+}
+
+APP = '''
+import sys, time, functools
+sys.path.insert(0, {tree!r})
+import numpy as np, pandas as pd
+import streamlit as st
+
+_fragment = st.fragment
+
+
+def timed_fragment(func=None, **kwargs):
+    # Record how long each fragment body takes: that is the cost of a fragment-scoped rerun
+    def decorate(f):
+        @functools.wraps(f)
+        def timed(*args, **kw):
+            start = time.perf_counter()
+            try:
+                return f(*args, **kw)
+            finally:
+                st.session_state.setdefault("_fragment_seconds", []).append(time.perf_counter() - start)
+        return _fragment(timed, **kwargs)
+    return decorate(func) if func is not None else decorate
+
+
+st.fragment = timed_fragment
+
+if "data" not in st.session_state:
+    rng = np.random.default_rng(0)
+    words = {words!r}
+    labels = rng.choice(list(words), size={rows})
+    texts = [" ".join(rng.choice(words[label], size=6)) + f" ticket {{i}}" for i, label in enumerate(labels)]
+    st.session_state.data = pd.DataFrame({{"Review": texts}})
+    st.session_state.selected_column = "Review"
+    from utils.results import get_results
+    get_results().set("Sentiment", pd.Series(labels, index=st.session_state.data.index))
+
+st.session_state["_fragment_seconds"] = []
+page = {page!r}
+exec(compile(open(page).read(), page, "exec"), {{"__name__": "__main__"}})
+'''
+
+SCENARIOS = [
+    ("Topic Modeling: switch word cloud topic", "pages/3_Topic_Modeling.py", "Select a Topic to View Word Cloud"),
+    ("Word Cloud: switch keyword label", "pages/4_Word_Cloud.py", "Distinctive words for"),
+]
+
+
+def find_selectbox(at, label):
+    for box in at.selectbox:
+        if box.label.startswith(label):
+            return box
+    raise LookupError(f"No selectbox labelled {label!r}")
+
+
+def run_scenario(tree, page, label, rows, repeats, workdir):
+    script = Path(workdir) / f"app_{Path(page).stem}.py"
+    script.write_text(APP.format(tree=str(tree), words=WORDS, rows=rows, page=str(Path(tree) / page)))
+    at = AppTest.from_file(str(script), default_timeout=1800).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    full, scoped = [], []
+    for i in range(repeats):
+        box = find_selectbox(at, label)
+        box.select(box.options[(i + 1) % len(box.options)])
+        start = time.perf_counter()
+        at.run()
+        full.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        fragments = at.session_state["_fragment_seconds"]
+        if fragments:
+            # Only the fragment holding the widget reruns; take the slowest to stay conservative
+            scoped.append(max(fragments))
+    return full, scoped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure page rerun latency on a large dataset.")
+    parser.add_argument("--tree", default=str(ROOT), help="Checkout of the app to measure")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{args.rows:,} rows, {args.repeats} interactions per scenario, tree {args.tree}")
+        for name, page, label in SCENARIOS:
+            full, scoped = run_scenario(args.tree, page, label, args.rows, args.repeats, workdir)
+            line = f"{name:45s} full rerun median {statistics.median(full) * 1000:8.1f} ms"
+            if scoped:
+                line += f" | scoped rerun median {statistics.median(scoped) * 1000:8.1f} ms"
+            print(line)
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
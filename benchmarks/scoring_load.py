@@ -0,0 +1,135 @@
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+
+# Local load generator for utils/scoring_service.py.
+#
+#   python benchmarks/scoring_load.py --spawn --concurrency 1 8 32 --requests 2000
+#
+# Each concurrency level opens that many keep-alive connections, sends
+# single-ticket /score requests as fast as responses come back and reports
+# throughput plus client-side p50/p99 latency, followed by the server's /metrics.
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SAMPLE_TICKETS = [
+    "The delivery was late again and nobody answered my emails.",
+    "Love the new design, the camera is fantastic!",
+    "Price is fair but the battery dies after two hours.",
+    "Customer service resolved my issue quickly, thank you.",
+    "Terrible experience, the app keeps crashing when I pay.",
+    "It works. Nothing special, nothing bad.",
+    "Absolutely thrilled with the quality, will buy again!",
+    "I am disappointed and frustrated with the refund process.",
+]
+
+
+async def post_json(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    return await read_response(reader)
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def get_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    _, payload = await read_response(reader)
+    writer.close()
+    return payload
+
+
+async def client(host, port, analyzer, counter, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] > 0:
+            counter[0] -= 1
+            start = time.perf_counter()
+            status, _ = await post_json(reader, writer, host, "/score",
+                                        {"analyzer": analyzer, "text": random.choice(SAMPLE_TICKETS)})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, analyzer, concurrency, n_requests):
+    counter, latencies, errors = [n_requests], [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, analyzer, counter, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+    }
+
+
+async def wait_until_ready(host, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return await get_json(host, port, "/health")
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def main(args):
+    await wait_until_ready(args.host, args.port)
+    print(f"{'concurrency':>11} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for concurrency in args.concurrency:
+        row = await run_level(args.host, args.port, args.analyzer, concurrency, args.requests)
+        print(f"{row['concurrency']:>11} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>9.1f} "
+              f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+    print("\nServer metrics:")
+    print(json.dumps((await get_json(args.host, args.port, "/metrics"))[args.analyzer], indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for the scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--analyzer", default="vader")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--spawn", action="store_true", help="Start the scoring service as a subprocess")
+    parser.add_argument("--service-args", default="", help="Extra arguments for the spawned service")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, "-m", "utils.scoring_service", "--host", args.host,
+                                   "--port", str(args.port), *args.service_args.split()], cwd=ROOT)
+    try:
+        asyncio.run(main(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
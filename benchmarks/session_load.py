@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))  # Run as a script from anywhere: the app's utils package
+
+from utils.shared_cache import get_shared_cache  # noqa: E402
+
+# Concurrent-session load test of the dashboard, for capacity planning.
+#
+#   python benchmarks/session_load.py --sessions 1 5 10 --rows 500000
+#   python benchmarks/session_load.py --sessions 10 --dataset /data/exports/ --text-column Review --report load.json
+#
+# Every simulated analyst is a headless AppTest session in this process (the Streamlit
+# server also runs all sessions in one process, sharing its caches and the GIL). A
+# session loads a dataset on Home.py, then opens each page in turn; the harness times
+# every step and samples the process RSS and CPU (this process and its worker
+# children) plus machine-wide CPU while the level runs.
+#
+# AppTest cannot drive st.file_uploader, so sessions load through Home's "Folder or
+# files on the server" source, which goes through the same reset and analysis path.
+# Without --dataset each session gets its own synthetic Parquet file (distinct
+# uploads, so the shared cache does not hide the work); --same-file gives all
+# sessions one file instead.
+
+PAGES = [
+    "pages/1_Sentiment_Analysis.py",
+    "pages/2_Emotion_Detection.py",
+    "pages/9_Sentiment_intensity_analysis.py",
+    "pages/3_Topic_Modeling.py",
+    "pages/5_Customer_Segmentation.py",
+]
+WORDS = {
+    "Positive": ["love", "great", "fast", "excellent", "friendly", "fantastic", "recommend"],
+    "Negative": ["late", "broken", "refund", "rude", "crash", "terrible", "slow"],
+    "Neutral": ["order", "package", "app", "delivery", "camera", "battery", "price"],
+}
+PERCENTILES = (50, 90, 95, 99)
+SAMPLE_SECONDS = 0.25
+STREAMLIT_TESTED = "1.66"  # Release whose internals allow_concurrent_apptests() patches
+
+
+def synthetic_dataset(path, rows, seed):
+    rng = np.random.default_rng(seed)
+    labels = rng.choice(list(WORDS), size=rows)
+    texts = [" ".join(rng.choice(WORDS[label], size=8)) + f" ticket {seed}-{i}" for i, label in enumerate(labels)]
+    frame = pd.DataFrame({
+        "Review": texts,
+        "Customer": rng.integers(0, max(1, rows // 5), size=rows),
+        "Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, size=rows), unit="D"),
+    })
+    frame.to_parquet(path, index=False)
+    return path
+
+
+# ---- Resource sampling (Linux /proc) ------------------------------------------------
+
+def process_tree():
+    # This process and its descendants (joblib/loky workers, prefetch pools)
+    children = {}
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            try:
+                parent = int((entry / "stat").read_text().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry.name))
+    pids, stack = [], [os.getpid()]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def tree_usage():
+    # (RSS bytes, CPU seconds) summed over the process tree
+    rss, cpu, tick, page = 0, 0.0, os.sysconf("SC_CLK_TCK"), os.sysconf("SC_PAGE_SIZE")
+    for pid in process_tree():
+        try:
+            fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / tick  # utime + stime
+        rss += int(fields[21]) * page
+    return rss, cpu
+
+
+def machine_cpu():
+    # (busy, total) jiffies across all cores
+    values = [int(v) for v in Path("/proc/stat").read_text().splitlines()[0].split()[1:]]
+    idle = values[3] + values[4]  # idle + iowait
+    return sum(values) - idle, sum(values)
+
+
+class ResourceSampler(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.samples = []  # (seconds, rss bytes, cores used by the tree, machine busy fraction)
+        self._done = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        last_cpu, last_machine, last_time = tree_usage()[1], machine_cpu(), start
+        while not self._done.wait(SAMPLE_SECONDS):
+            now = time.perf_counter()
+            rss, cpu = tree_usage()
+            busy, total = machine_cpu()
+            cores = (cpu - last_cpu) / (now - last_time)
+            machine = (busy - last_machine[0]) / max(1, total - last_machine[1])
+            self.samples.append((now - start, rss, cores, machine))
+            last_cpu, last_machine, last_time = cpu, (busy, total), now
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# ---- Sessions -----------------------------------------------------------------------
+
+def allow_concurrent_apptests():
+    # AppTest assumes one app run at a time. Keep the process-wide state the real server shares
+    # in place across overlapping runs: one ScriptCache (concurrent compile() calls can also
+    # crash CPython's parser), the runtime, the pages-directory flag and the appTest option.
+    # These are Streamlit internals, so every patch lives here and is checked before it is applied
+    from streamlit import config
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    release = ".".join(streamlit.__version__.split(".")[:2])
+    if release != STREAMLIT_TESTED:
+        raise RuntimeError(f"session_load.py patches Streamlit {STREAMLIT_TESTED} internals to run sessions "
+                           f"concurrently; Streamlit {streamlit.__version__} is installed. Check "
+                           f"allow_concurrent_apptests() against it and update STREAMLIT_TESTED.")
+    patched = [(app_test, "ScriptCache"), (local_script_runner, "ScriptCache"), (app_test, "Runtime"),
+               (app_test, "PagesManager"), (Runtime, "_instance"), (PagesManager, "uses_pages_directory")]
+    missing = [f"{owner.__name__}.{name}" for owner, name in patched if not hasattr(owner, name)]
+    if missing:
+        raise RuntimeError(f"Streamlit internals patched by session_load.py are missing: {', '.join(missing)}")
+
+    class SharedRuntime:
+        # Stands in for Runtime inside AppTest: each run installs a mock runtime and resets it to None
+        # when it finishes, which would pull the runtime from under the scripts of the other sessions
+        def __getattr__(self, name):
+            return getattr(Runtime, name)
+
+        def __dir__(self):
+            return dir(Runtime)  # AppTest builds its mock with spec=Runtime
+
+        def __setattr__(self, name, value):
+            if not (name == "_instance" and value is None):
+                setattr(Runtime, name, value)
+
+    class SessionPagesManager(PagesManager):
+        pass  # AppTest resets uses_pages_directory on every run; this keeps it off the shared class
+
+    shared = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: shared
+    app_test.Runtime = SharedRuntime()
+    app_test.PagesManager = SessionPagesManager
+    config.set_option("global.appTest", True)
+
+
+def run_session(dataset, text_column, pages, think, timings, errors):
+    def step(name, action):
+        start = time.perf_counter()
+        try:
+            at = action()
+            if at.exception:
+                errors.append((name, at.exception[0].value))
+        except Exception as e:
+            errors.append((name, f"{type(e).__name__}: {e}"))
+        timings.setdefault(name, []).append(time.perf_counter() - start)
+        time.sleep(random.uniform(0, think))
+
+    at = AppTest.from_file(str(ROOT / "Home.py"), default_timeout=3600)
+    step("Home: open", at.run)
+    at.radio[0].set_value("Folder or files on the server")
+    at.run()
+    at.text_input(key="source_path").input(str(dataset))
+    at.run()
+    at.selectbox(key="source_text_column").select(text_column)
+    at.run()
+    step("Home: load dataset", at.button(key="source_load").click().run)
+    if at.session_state["data"] is None:
+        errors.append(("Home: load dataset", "no data loaded"))
+        return
+    for page in pages:
+        step(Path(page).stem, lambda: at.switch_page(page).run())
+
+
+def run_level(n_sessions, datasets, text_column, pages, think, ramp):
+    timings, errors, threads = {}, [], []
+    sampler = ResourceSampler()
+    baseline_rss = tree_usage()[0]
+    sampler.start()
+    start = time.perf_counter()
+    for i in range(n_sessions):
+        thread = threading.Thread(target=run_session, args=(datasets[i % len(datasets)], text_column, pages, think,
+                                                            timings, errors))
+        thread.start()
+        threads.append(thread)
+        time.sleep(ramp)
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    sampler.stop()
+    return summarize(n_sessions, wall, baseline_rss, sampler.samples, timings, errors)
+
+
+def summarize(n_sessions, wall, baseline_rss, samples, timings, errors):
+    rss = np.array([s[1] for s in samples] or [baseline_rss], dtype=np.float64)
+    cores = np.array([s[2] for s in samples] or [0.0])
+    machine = np.array([s[3] for s in samples] or [0.0])
+    return {
+        "sessions": n_sessions,
+        "wall_seconds": wall,
+        "steps": {name: {"count": len(values), **{f"p{q}_ms": float(np.percentile(values, q)) * 1000 for q in PERCENTILES},
+                         "max_ms": max(values) * 1000}
+                  for name, values in timings.items()},
+        "errors": [{"step": name, "error": error} for name, error in errors],
+        "rss_mb": {"baseline": baseline_rss / 2**20, "peak": rss.max() / 2**20, "end": rss[-1] / 2**20,
+                   "growth": (rss.max() - baseline_rss) / 2**20},
+        "cpu": {
+            "cores": os.cpu_count(),
+            "mean_cores_used": float(cores.mean()),
+            "peak_cores_used": float(cores.max()),
+            "machine_busy_mean": float(machine.mean()),
+            # Share of samples with the machine (nearly) fully busy: sessions are queueing for CPU
+            "saturated_fraction": float((machine >= 0.95).mean()),
+        },
+    }
+
+
+def print_level(level):
+    cpu, rss = level["cpu"], level["rss_mb"]
+    print(f"\n== {level['sessions']} concurrent session(s) · {level['wall_seconds']:.1f} s wall ==")
+    print(f"{'step':40s} {'n':>4s} " + " ".join(f"{f'p{q}':>9s}" for q in PERCENTILES) + f" {'max':>9s}   (ms)")
+    for name, stats in level["steps"].items():
+        print(f"{name:40s} {stats['count']:4d} " + " ".join(f"{stats[f'p{q}_ms']:9.0f}" for q in PERCENTILES)
+              + f" {stats['max_ms']:9.0f}")
+    print(f"RSS {rss['baseline']:.0f} MB -> peak {rss['peak']:.0f} MB (+{rss['growth']:.0f} MB), end {rss['end']:.0f} MB")
+    print(f"CPU {cpu['mean_cores_used']:.2f} cores mean / {cpu['peak_cores_used']:.2f} peak of {cpu['cores']} · "
+          f"machine busy {cpu['machine_busy_mean']:.0%} mean, saturated {cpu['saturated_fraction']:.0%} of the time")
+    if level["errors"]:
+        counts = {}
+        for error in level["errors"]:
+            message = " ".join(str(error["error"]).split())[:120]  # First words, on one line
+            counts[(error["step"], message)] = counts.get((error["step"], message), 0) + 1
+        print(f"{len(level['errors'])} error(s):")
+        for (step, message), count in counts.items():
+            print(f"  {count:3d} × {step}: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent headless app sessions and report latency and resources.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10], help="Concurrency levels to run")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows per synthetic dataset")
+    parser.add_argument("--dataset", help="Existing Parquet/CSV file, folder or glob instead of synthetic data")
+    parser.add_argument("--text-column", default="Review")
+    parser.add_argument("--same-file", action="store_true", help="All sessions load the same synthetic file")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--think", type=float, default=0.0, help="Max random pause between steps (s)")
+    parser.add_argument("--ramp", type=float, default=0.5, help="Delay between session starts (s)")
+    parser.add_argument("--report", help="Write the full report as JSON to this path")
+    args = parser.parse_args()
+
+    allow_concurrent_apptests()
+    os.chdir(ROOT)  # Pages resolve models/ and .cache/ relative to the app
+    report = {"rows": args.rows, "dataset": args.dataset, "pages": args.pages, "levels": []}
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.dataset:
+            datasets = [args.dataset]
+        else:
+            n_files = 1 if args.same_file else max(args.sessions)
+            print(f"Writing {n_files} synthetic dataset(s) of {args.rows:,} rows...")
+            datasets = [synthetic_dataset(Path(workdir) / f"session_{i}.parquet", args.rows, seed=i) for i in range(n_files)]
+
+        for n_sessions in args.sessions:
+            get_shared_cache().clear()  # Each level starts cold, as after a server restart
+            level = run_level(n_sessions, datasets, args.text_column, args.pages, args.think, args.ramp)
+            report["levels"].append(level)
+            print_level(level)
+            sys.stdout.flush()
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from textblob import TextBlob
+from utils.analysis import get_sentiment
+from utils.results import get_results
+from utils.chart_data import category_counts
 
 st.markdown("<h1 style='text-align: center;'> 📊 Sentiment Analysis</h1>", unsafe_allow_html=True)
 
@@ -35,28 +37,17 @@ else:
 
     st.write(f"✅ **Analyzing Sentiment for Column:** `{selected_column}`")
 
-    # Sentiment Analysis Function
-    def get_sentiment(text):
-        if isinstance(text, str):  # Ensure text is a string
-            analysis = TextBlob(text)
-            return "Positive" if analysis.sentiment.polarity > 0 else "Negative" if analysis.sentiment.polarity < 0 else "Neutral"
-        return "Neutral"
-
     # Compute Sentiment Analysis if not already stored
-    if "sentiment_results" not in st.session_state or "Sentiment" not in st.session_state.sentiment_results.columns:
-        st.session_state.sentiment_results = df.copy()
-        st.session_state.sentiment_results["Sentiment"] = st.session_state.sentiment_results[selected_column].apply(get_sentiment)
-
-    df_result = st.session_state.sentiment_results  # Use stored results
+    results = get_results()
+    results.score("Sentiment", get_sentiment)
 
     # 📊 **Sentiment Distribution Plot**
     st.subheader("📊 Sentiment Distribution")
     
-    if "Sentiment" in df_result.columns:  # Ensure Sentiment column exists before plotting
-        sentiment_counts = df_result["Sentiment"].value_counts().reset_index()
-        sentiment_counts.columns = ["Sentiment", "Count"]
+    if "Sentiment" in results:  # Ensure Sentiment column exists before plotting
+        sentiment_counts = results.aggregate("Sentiment", category_counts)
         fig = px.pie(sentiment_counts, names="Sentiment", values="Count", title="Sentiment Distribution", hole=0.3, color="Sentiment")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, width="stretch")
     else:
         st.error("🚨 Error: Sentiment analysis was not computed correctly.")
 
@@ -77,9 +68,10 @@ else:
 
     # 📋 **Sample Data with Sentiments**
     st.subheader("📋 Sample Data with Sentiment")
-    st.write(df_result[[selected_column, "Sentiment"]].head())
+    st.write(results.head(["Sentiment"]))
 
     # 📥 **Download Option**
     st.subheader("📥 Download Sentiment Data")
-    csv = df_result[[selected_column, "Sentiment"]].to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "sentiment_analysis.csv", "text/csv", key="download-csv")
+    csv = results.to_csv(["Sentiment"])
+    st.download_button("Download CSV", csv, "sentiment_analysis.csv", "text/csv", key="download-csv",
+                       on_click="ignore")
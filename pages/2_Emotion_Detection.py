@@ -6,13 +6,12 @@ nltk.download('wordnet') # Required for lemmatization
 nltk.download('stopwords')  # Required for stopwords filtering
 nltk.download('movie_reviews')  # Required for TextBlob's sentiment analysis
 nltk.download('vader_lexicon')  # Required for VADER sentiment analysis
-from textblob import TextBlob  # Correct way to import TextBlob
-# Download required corpora
-textblob.download_corpora()
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from nrclex import NRCLex
+from utils.analysis import get_emotions
+from utils.results import get_results
+from utils.chart_data import category_counts
 
 st.markdown("<h1 style='text-align: center;'> 😊 Emotion Detection </h1>", unsafe_allow_html=True)
 #st.title("")
@@ -48,34 +47,15 @@ else:
 
     st.write(f"✅ **Detecting Emotions for Column:** `{selected_column}`")
 
-    # Emotion Detection Function
-    def get_emotions(text):
-        if isinstance(text, str):  # Ensure text is a string
-            emotions = NRCLex(text).top_emotions
-            return max(emotions, key=lambda x: x[1])[0] if emotions else "Neutral"
-        return "Neutral"
-
-    # Recompute if dataset/column changes
-    if "emotion_results" not in st.session_state or \
-       st.session_state.emotion_results is None or \
-       "prev_data" not in st.session_state or \
-       st.session_state.prev_data != df[selected_column].tolist():
-        
-        df_result = df.copy()
-        df_result["Emotion"] = df_result[selected_column].apply(get_emotions)
-
-        # Store results in session state
-        st.session_state.emotion_results = df_result
-        st.session_state.prev_data = df[selected_column].tolist()  # Store dataset snapshot
-
-    df_result = st.session_state.emotion_results  # Use stored results
+    # Recompute if dataset/column changes (the results store is reset on a new upload or column)
+    results = get_results()
+    results.score("Emotion", get_emotions)
 
     # 📊 **Emotion Distribution Plot**
     st.subheader("📊 Emotion Breakdown")
-    emotion_counts = df_result["Emotion"].value_counts().reset_index()
-    emotion_counts.columns = ["Emotion", "Count"]
+    emotion_counts = results.aggregate("Emotion", category_counts)
     fig = px.bar(emotion_counts, x="Emotion", y="Count", title="Emotion Distribution", color="Emotion")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="stretch")
 
     # 📌 **How to Interpret This Graph?**
     with st.expander("📈 **How to Interpret This Graph?**", expanded=True):
@@ -89,12 +69,13 @@ else:
 
     # 📋 **Sample Data with Emotions**
     st.subheader("📋 Sample Data with Emotions")
-    st.write(df_result[[selected_column, "Emotion"]].head())
+    st.write(results.head(["Emotion"]))
 
     # 📥 **Download Option**
     st.subheader("📥 Download Emotion Data")
-    csv = df_result[[selected_column, "Emotion"]].to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "emotion_analysis.csv", "text/csv", key="download-csv")
+    csv = results.to_csv(["Emotion"])
+    st.download_button("Download CSV", csv, "emotion_analysis.csv", "text/csv", key="download-csv",
+                       on_click="ignore")
 
     # 🏆 **Business Insights from This Visualization**
     with st.expander("🏆 **Business Insights from This Visualization**", expanded=True):
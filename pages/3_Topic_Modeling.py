@@ -1,14 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
+from utils.results import get_results
+from utils.chart_data import category_counts
+from utils.topic_registry import fit_topics, list_topic_models, load_topic_model, save_topic_model, assign_topics, extract_topic_keywords, topic_word_frequencies
+from utils.wordcloud_render import prerender_wordclouds
+from utils.topic_stream import source_columns, fit_topics_out_of_core, topic_counts_out_of_core
 
 st.markdown("<h1 style='text-align: center;'> 🧠 Topic Modeling </h1>", unsafe_allow_html=True)
 
 
+@st.cache_resource
+def load_saved_model(name, version):
+    return load_topic_model(name, version)
+
+
 # 📌 **Feature Explanation Card**
 with st.expander("ℹ️ **What is Topic Modeling?**", expanded=True):
     st.markdown("""
@@ -36,43 +42,59 @@ else:
 
     st.write(f"✅ **Finding Topics in:** `{selected_column}`")
 
-    # User input: Number of topics
-    n_topics = st.slider("Select Number of Topics", min_value=2, max_value=10, value=3, step=1)
+    # User input: fit a new model or re-use a saved one (stable topic ids across uploads)
+    saved_models = list_topic_models()
+    mode = st.radio("Topic model", ["Fit a new model", "Use a saved model"], horizontal=True,
+                    disabled=not saved_models, help="Save a fitted model below to re-use it on later uploads.")
+
+    if mode == "Fit a new model":
+        n_topics = st.slider("Select Number of Topics", min_value=2, max_value=10, value=3, step=1)
+        topic_key = ("fit", n_topics)
+    else:
+        labels = {f"{m['name']} v{m['version']} · {m['n_topics']} topics · {m['created'][:10]}": m for m in saved_models}
+        model_meta = labels[st.selectbox("Saved topic model", list(labels))]
+        topic_key = ("saved", model_meta["name"], model_meta["version"])
 
     # Ensure session state has topic_results
     if "topic_results" not in st.session_state:
-        st.session_state.topic_results = {"n_topics": None}  # Initialize storage
+        st.session_state.topic_results = {"key": None}  # Initialize storage
 
-    # Only recompute if n_topics changes
-    if st.session_state.topic_results["n_topics"] != n_topics:
-        df_clean = df.dropna(subset=[selected_column])  # Remove missing values
+    results = get_results()
 
-        # Convert text into numerical format
-        vectorizer = CountVectorizer(stop_words="english", max_features=1000)
-        X = vectorizer.fit_transform(df_clean[selected_column])
+    # Only recompute if the model choice changes (or the dataset/column did)
+    if st.session_state.topic_results.get("key") != topic_key or "Topic" not in results:
+        # One text per near-duplicate cluster (all rows when collapsing is off), so spam does not skew topics
+        representatives = results.representative_texts()
+        texts = representatives.dropna()  # Remove missing values
 
-        # Apply LDA
-        lda = LatentDirichletAllocation(n_components=n_topics, random_state=42)
-        topic_distribution = lda.fit_transform(X)
+        if mode == "Fit a new model":
+            # Identical uploads on the server share one fitted model (possibly prefetched from Home)
+            topics, vectorizer, lda = results.cached("Topic", lambda: fit_topics(representatives, n_topics, results.broadcast),
+                                                     n_topics=n_topics)
+        else:
+            vectorizer, lda, _ = load_saved_model(model_meta["name"], model_meta["version"])
 
-        # Extract topic keywords
-        words = vectorizer.get_feature_names_out()
-        topic_keywords = {
-            i: [words[idx] for idx in topic.argsort()[-10:]] for i, topic in enumerate(lda.components_)
-        }
+            def transform_topics():
+                # Transform-only path over parallel chunks: no refit, topic ids match the saved model
+                assigned = assign_topics(texts, vectorizer, lda)
+                topics = pd.Series(assigned, index=texts.index).astype("category")
+                return results.broadcast(topics.reindex(representatives.index))
+
+            topics = results.cached("Topic", transform_topics, model=model_meta["name"], version=model_meta["version"])
 
-        # Assign topics to texts
-        df_clean["Topic"] = topic_distribution.argmax(axis=1)
+        results.set("Topic", topics)
 
         # Store results in session state
         st.session_state.topic_results = {
-            "df": df_clean,
-            "topic_keywords": topic_keywords,
-            "n_topics": n_topics  # Store n_topics properly
+            "topic_keywords": extract_topic_keywords(vectorizer, lda),
+            # Every topic's cloud is rendered up front (in parallel), so switching topics is instant
+            "topic_clouds": prerender_wordclouds(topic_word_frequencies(vectorizer, lda)),
+            "vectorizer": vectorizer,
+            "lda": lda,
+            "key": topic_key,
         }
 
     # Load results from session state
-    df_clean = st.session_state.topic_results["df"]
     topic_keywords = st.session_state.topic_results["topic_keywords"]
 
     # 📊 **Display Topics**
@@ -80,13 +102,30 @@ else:
     for topic_id, keywords in topic_keywords.items():
         st.write(f"**Topic {topic_id + 1}:** {', '.join(keywords)}")
 
+    # 💾 **Save the Fitted Model** (so next week's upload gets the same topic ids)
+    if mode == "Fit a new model":
+        @st.fragment
+        def save_model():
+            # Typing a name or saving reruns only this expander
+            with st.expander("💾 Save This Topic Model"):
+                model_name = st.text_input("Model name", value="customer-feedback")
+                if st.button("Save to Model Registry"):
+                    meta = save_topic_model(model_name, st.session_state.topic_results["vectorizer"],
+                                            st.session_state.topic_results["lda"], metadata={
+                                                "text_column": selected_column,
+                                                "rows": len(df),
+                                                "fingerprint": results.fingerprint(),
+                                            })
+                    st.success(f"✅ Saved **{meta['name']} v{meta['version']}**. Choose *Use a saved model* on later uploads.")
+
+        save_model()
+
     # 📊 **Topic Distribution Plot**
     st.subheader("📊 Topic Distribution")
-    topic_counts = df_clean["Topic"].value_counts().reset_index()
-    topic_counts.columns = ["Topic", "Count"]
+    topic_counts = results.aggregate("Topic", category_counts)
     fig = px.bar(topic_counts, x="Topic", y="Count", title="Topic Distribution", color="Topic", 
                  color_continuous_scale="viridis")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="stretch")
 
     # 📌 **How to Interpret This Graph?**
     with st.expander("📈 **How to Interpret This Graph?**", expanded=True):
@@ -100,15 +139,15 @@ else:
 
     # 🔍 **Interactive Word Cloud for Each Topic**
     st.subheader("☁️ Word Cloud for Topics")
-    topic_selected = st.selectbox("Select a Topic to View Word Cloud", list(topic_keywords.keys()))
 
-    if topic_selected in topic_keywords:
-        wordcloud = WordCloud(width=800, height=400, background_color="white").generate(" ".join(topic_keywords[topic_selected]))
+    @st.fragment
+    def topic_cloud():
+        # Switching topics reruns only this fragment; the clouds are already rendered
+        topic_selected = st.selectbox("Select a Topic to View Word Cloud", list(topic_keywords.keys()))
+        if topic_selected in topic_keywords:
+            st.image(st.session_state.topic_results["topic_clouds"][topic_selected], width="stretch")
 
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation="bilinear")
-        ax.axis("off")
-        st.pyplot(fig)
+    topic_cloud()
 
     # 📌 **How to Interpret the Word Cloud?**
     with st.expander("☁️ **How to Interpret the Word Cloud?**", expanded=True):
@@ -121,12 +160,13 @@ else:
 
     # 📋 **Sample Data with Topics**
     st.subheader("📋 Sample Data with Topics")
-    st.write(df_clean[[selected_column, "Topic"]].head())
+    st.write(results.head(["Topic"]))
 
     # 📥 **Download Option**
     st.subheader("📥 Download Topic Data")
-    csv = df_clean[[selected_column, "Topic"]].to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "topics.csv", "text/csv", key="download-topics")
+    csv = results.to_csv(["Topic"])
+    st.download_button("Download CSV", csv, "topics.csv", "text/csv", key="download-topics",
+                       on_click="ignore")
 
     # 🏆 **Business Insights from This Visualization**
     with st.expander("🏆 **Business Insights from This Visualization**", expanded=True):
@@ -138,3 +178,70 @@ else:
         - **Competitive Analysis**: Track **brand mentions & public opinion** across different topics.
         """)
 
+
+# 🗄️ **Out-of-Core Topic Modeling** (files on the server that are larger than memory)
+with st.expander("🗄️ **Out-of-Core Topic Modeling for Very Large Files**"):
+    st.markdown("""
+    Streams a CSV/Parquet file, a folder of them or a glob such as `exports/*.parquet` from the server's disk in chunks,
+    so memory stays bounded whatever the number of rows. LDA is trained incrementally over several passes.
+    """)
+    ooc_path = st.text_input("File, folder or glob on the server", key="ooc_path")
+    try:
+        ooc_columns = source_columns(ooc_path) if ooc_path else []
+    except (ValueError, OSError) as e:
+        st.error(f"❌ Could not read the file(s): {e}")
+        ooc_columns = None
+
+    if ooc_path and ooc_columns == []:
+        st.warning("⚠️ No readable CSV or Parquet file found at this path.")
+    elif ooc_columns:
+        col1, col2 = st.columns(2)
+        ooc_column = col1.selectbox("Text column", ooc_columns, key="ooc_column")
+        ooc_mode = col2.selectbox("Vectorization", ["vocabulary", "hashing"], key="ooc_mode",
+                                  help="vocabulary: top terms from a first scan pass · hashing: fixed-size feature space")
+        col1, col2 = st.columns(2)
+        ooc_topics = col1.slider("Number of Topics", min_value=2, max_value=20, value=5, key="ooc_topics")
+        ooc_passes = col2.slider("Training passes", min_value=1, max_value=5, value=2, key="ooc_passes")
+
+        if st.button("Train Out-of-Core Model"):
+            progress_bar = st.progress(0.0, text="Scanning...")
+
+            def report(stage, current_pass, value):
+                if stage == "scan":
+                    progress_bar.progress(0.0, text=f"Scanning... {value:,} rows")
+                else:
+                    done = (current_pass + min(value, 1.0)) / ooc_passes
+                    progress_bar.progress(done, text=f"Training pass {current_pass + 1}/{ooc_passes}")
+
+            try:
+                vectorizer, lda, n_rows = fit_topics_out_of_core(ooc_path, ooc_column, ooc_topics, passes=ooc_passes,
+                                                                 mode=ooc_mode, progress=report)
+                progress_bar.progress(1.0, text="Assigning topics...")
+                counts = topic_counts_out_of_core(ooc_path, ooc_column, vectorizer, lda)
+            except (ValueError, OSError) as e:  # No text in the column, a shard without it, unreadable file
+                st.error(f"❌ Could not train the model: {e}")
+            else:
+                st.session_state.ooc_topic_model = {
+                    "vectorizer": vectorizer,
+                    "lda": lda,
+                    "rows": n_rows,
+                    "source": ooc_path,
+                    "column": ooc_column,
+                    "counts": counts,
+                }
+            progress_bar.empty()
+
+        ooc = st.session_state.get("ooc_topic_model")
+        if ooc:
+            st.write(f"✅ **Trained on {ooc['rows']:,} rows of** `{ooc['column']}`")
+            for topic_id, keywords in extract_topic_keywords(ooc["vectorizer"], ooc["lda"]).items():
+                st.write(f"**Topic {topic_id + 1}:** {', '.join(keywords)}")
+            counts = pd.DataFrame({"Topic": range(len(ooc["counts"])), "Count": ooc["counts"]})
+            st.plotly_chart(px.bar(counts, x="Topic", y="Count", title="Topic Distribution (Out-of-Core)"), width="stretch")
+
+            ooc_name = st.text_input("Model name", value="large-corpus", key="ooc_model_name")
+            if st.button("Save to Model Registry", key="ooc_save"):
+                meta = save_topic_model(ooc_name, ooc["vectorizer"], ooc["lda"], metadata={
+                    "text_column": ooc["column"], "rows": ooc["rows"], "source": ooc["source"], "out_of_core": True,
+                })
+                st.success(f"✅ Saved **{meta['name']} v{meta['version']}**.")
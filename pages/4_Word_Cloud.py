@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from wordcloud import WordCloud, STOPWORDS
+from wordcloud import STOPWORDS
+from utils.analysis import get_sentiment
+from utils.keywords import LABEL_COLUMNS, SCORERS, keyword_counts, keyword_table
+from utils.results import get_results
+from utils.wordcloud_render import add_counts, render_wordcloud, top_frequencies, word_counts
 
 st.markdown("<h1 style='text-align: center;'> ☁️ Word Cloud Analysis </h1>", unsafe_allow_html=True)
 
@@ -36,32 +40,22 @@ else:
 
     st.write(f"✅ **Generating Word Cloud for:** `{selected_column}`")
 
-    # Check if Word Cloud was already computed
-    if "word_cloud" not in st.session_state:
-        # Combine all text data into a single string
-        text_data = " ".join(df[selected_column].dropna().astype(str))
+    # Word counts are computed once per dataset (and shared with other sessions); appended rows are counted on their own
+    def count_words(texts, weights):
+        # Combine all text data into a single string (one text per near-duplicate cluster)
+        text_data = " ".join(texts.dropna().astype(str))
 
         # Define stopwords to remove common words
-        stopwords = set(STOPWORDS)
+        return word_counts(text_data, stopwords=set(STOPWORDS))
 
-        # Generate Word Cloud
-        wordcloud = WordCloud(
-            width=800, height=400, background_color="white",
-            stopwords=stopwords, colormap="viridis"
-        ).generate(text_data)
+    results = get_results()
+    counts = results.accumulate("Word Counts", count_words, add_counts)
+    frequencies = results.cached("Word Frequencies", lambda: top_frequencies(counts))
 
-        # Store Word Cloud in session state
-        st.session_state.word_cloud = wordcloud
-
-    # Load Word Cloud from session state
-    wordcloud = st.session_state.word_cloud
-
-    # 📊 **Display Word Cloud**
+    # 📊 **Display Word Cloud** (cached PNG; rendered once per frequencies/settings)
     st.subheader("📊 Word Cloud Visualization")
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wordcloud, interpolation="bilinear")
-    ax.axis("off")
-    st.pyplot(fig)
+    st.image(render_wordcloud(frequencies, width=800, height=400, background_color="white", colormap="viridis"),
+             width="stretch")
 
     # 🔽 **Dropdown: How to Interpret This Graph?**
     with st.expander("📈 **How to Interpret This Word Cloud?**"):
@@ -81,7 +75,7 @@ else:
 
     # 📋 **Word Frequency Table**
     st.subheader("📋 Top 15 Most Frequent Words")
-    word_freq = pd.DataFrame(wordcloud.words_.items(), columns=["Word", "Frequency"]).head(15)
+    word_freq = pd.DataFrame(frequencies.items(), columns=["Word", "Frequency"]).head(15)
     st.write(word_freq)
 
     # 📊 **Word Frequency Bar Chart**
@@ -92,8 +86,54 @@ else:
     ax.set_ylabel("Frequency")
     ax.set_title("Top 15 Most Frequent Words")
     st.pyplot(fig)
+    plt.close(fig)  # Release the figure instead of accumulating one per rerun
 
     # 📥 **Download Option**
     st.subheader("📥 Download Word Frequency Data")
     csv = word_freq.to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "word_frequency.csv", "text/csv", key="download-words")
+    st.download_button("Download CSV", csv, "word_frequency.csv", "text/csv", key="download-words",
+                       on_click="ignore")
+
+    # 🔑 **Keywords by Label** (one sparse document-term matrix, per-class counts reused for every slice)
+    @st.fragment
+    def keywords_by_label():
+        # Changing the label column, class or statistic reruns only this section
+        st.subheader("🔑 Keywords by Label")
+        results = get_results()
+        label_columns = [name for name in LABEL_COLUMNS if name in results]
+        if not label_columns:
+            st.info("ℹ️ Run Sentiment, Emotion, Topic Modeling or Segmentation first to compare keywords across their labels.")
+            if st.button("Compute sentiment labels now", key="keywords_sentiment"):
+                results.score("Sentiment", get_sentiment)
+                st.rerun(scope="fragment")
+        else:
+            col1, col2 = st.columns(2)
+            label_column = col1.selectbox("Label column", label_columns, key="keywords_label_column")
+            method = col2.radio("Statistic", list(SCORERS), horizontal=True, key="keywords_method")
+
+            terms, classes, counts = keyword_counts(results, label_column)
+            if not classes:
+                st.warning("⚠️ No labelled rows to compare.")
+            else:
+                label = st.selectbox(f"Distinctive words for {label_column}", classes, key="keywords_label")
+                keywords = keyword_table(terms, classes, counts, label, method=method, top=20)
+                st.write(keywords)
+
+                distinctive = keywords[keywords["Score"] > 0]
+                if not distinctive.empty:
+                    st.image(render_wordcloud(dict(zip(distinctive["Word"], distinctive["Score"])), width=800, height=300),
+                             width="stretch")
+
+                st.download_button("Download Keywords", keywords.to_csv(index=False).encode("utf-8"),
+                                   f"keywords_{label_column}_{label}.csv", "text/csv", key="download-keywords",
+                                   on_click="ignore")
+
+            with st.expander("📈 **How to Read These Scores?**"):
+                st.markdown("""
+                - **Log-odds (z)** compares how often a word appears in the selected label versus all other labels,  
+                  smoothed by its overall frequency so rare words do not dominate. Values above ~2 are notable.  
+                - **Chi-square** measures how strongly a word's presence depends on the label.  
+                - Words with a **positive score** are over-represented in the selected label.  
+                """)
+
+    keywords_by_label()
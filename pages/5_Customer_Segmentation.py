@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from sklearn.cluster import KMeans
-from textblob import TextBlob
+from utils.analysis import get_emotions, get_polarity, get_sentiment_intensity
+from utils.results import get_results
+from utils.chart_data import category_counts
+from utils.segmentation import segment_boundaries, segment_scores
+from utils.rollups import customer_rollups, segment_customers, segment_profiles
 
 st.markdown("<h1 style='text-align: center;'> 🎭 Sentiment-Based Customer Segmentations </h1>", unsafe_allow_html=True)
 
@@ -39,51 +42,116 @@ else:
 
     st.write(f"✅ **Segmenting Customers Based on Sentiment in:** `{selected_column}`")
 
-    # Check if clustering was already computed
-    if "sentiment_clusters" not in st.session_state:
-        df_clean = df.dropna(subset=[selected_column])  # Remove missing values
-
-        # Get sentiment scores
-        df_clean["Sentiment Score"] = df_clean[selected_column].apply(lambda x: TextBlob(str(x)).sentiment.polarity)
-
-        # Apply clustering
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-        df_clean["Cluster"] = kmeans.fit_predict(df_clean[["Sentiment Score"]])
-
-        # Store results in session state
-        st.session_state.sentiment_clusters = df_clean
-
-    # Load results from session state
-    df_clean = st.session_state.sentiment_clusters
-
-    # 📊 **Customer Segment Distribution**
-    st.subheader("📊 Customer Segment Distribution")
-    fig = px.histogram(df_clean, x="Cluster", title="Customer Segments Based on Sentiment", nbins=3, color="Cluster")
-    st.plotly_chart(fig, use_container_width=True)
-
-    # 📖 **Graph Interpretation (Dropdown)**
-    with st.expander("📈 **How to Interpret This Graph?**"):
-        st.markdown("""
-        - This graph shows **how many customers** fall into each sentiment segment.  
-        - Each bar represents a **customer segment**, where:  
-          - **Cluster 0:** Likely **Negative Sentiment Customers** (low sentiment scores)  
-          - **Cluster 1:** Likely **Neutral Sentiment Customers** (mid-range scores)  
-          - **Cluster 2:** Likely **Positive Sentiment Customers** (high scores)  
-        """)
-
-    # 🏆 **Business Insights (Dropdown)**
-    with st.expander("🏆 **Business Insights from This Visualization**"):
-        st.markdown("""
-        - If **negative sentiment customers (Cluster 0) are high**, you need to address **common complaints**.  
-        - If **positive sentiment customers (Cluster 2) dominate**, your product/service is well-received!  
-        - If **neutral sentiment customers (Cluster 1) are high**, focus on **enhancing their experience** to turn them into positive customers.  
-        """)
-
-    # 📋 **Sample Data with Sentiments**
-    st.subheader("📋 Sample Data with Sentiments & Clusters")
-    st.write(df_clean[[selected_column, "Sentiment Score", "Cluster"]].head())
-
-    # 📥 **Download Option**
-    st.subheader("📥 Download Segmented Data")
-    csv = df_clean[[selected_column, "Sentiment Score", "Cluster"]].to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "customer_segments.csv", "text/csv", key="download-segments")
+    # Segment reviews, or customers: per-review scores rolled up per customer/entity ID
+    other_columns = [c for c in df.columns if c != selected_column]
+    mode = st.radio("Segment", ["Reviews", "Customers (by ID column)"], horizontal=True, disabled=not other_columns,
+                    help="With several reviews per customer, segment the customers on their aggregated scores.")
+
+    results = get_results()
+    if mode == "Reviews":
+
+        # Sentiment scores (one per near-duplicate cluster, broadcast to every row)
+        results.score("Sentiment Score", get_polarity)
+
+        # Segments are fitted and assigned reading the scores chunk by chunk (they may be spilled to disk)
+        results.compute("Cluster", lambda: segment_scores(results, "Sentiment Score", n_clusters=3), n_clusters=3)
+
+        # 📏 **Segment Thresholds** (read from the score sketch; no pass over the rows)
+        sketch = results.sketch("Sentiment Score")
+        boundaries = segment_boundaries(results, "Sentiment Score", n_clusters=3)
+        st.write("📏 **Segment thresholds:** " + " · ".join(
+            f"Cluster {i} | {i + 1} at **{b:+.2f}** ({sketch.cdf(b):.0%} of rows below)" for i, b in enumerate(boundaries)))
+        quartiles = sketch.quantile([0.25, 0.5, 0.75])
+        st.write(f"**Sentiment score quartiles:** {quartiles[0]:+.2f} / {quartiles[1]:+.2f} / {quartiles[2]:+.2f}")
+
+        # 📊 **Customer Segment Distribution** (counts are aggregated server-side)
+        st.subheader("📊 Customer Segment Distribution")
+        cluster_counts = results.aggregate("Cluster", category_counts).sort_values("Cluster")
+        cluster_counts["Cluster"] = cluster_counts["Cluster"].astype(str)
+        fig = px.bar(cluster_counts, x="Cluster", y="Count", title="Customer Segments Based on Sentiment", color="Cluster")
+        st.plotly_chart(fig, width="stretch")
+
+        # 📖 **Graph Interpretation (Dropdown)**
+        with st.expander("📈 **How to Interpret This Graph?**"):
+            st.markdown("""
+            - This graph shows **how many customers** fall into each sentiment segment.  
+            - Each bar represents a **customer segment**, where:  
+              - **Cluster 0:** Likely **Negative Sentiment Customers** (low sentiment scores)  
+              - **Cluster 1:** Likely **Neutral Sentiment Customers** (mid-range scores)  
+              - **Cluster 2:** Likely **Positive Sentiment Customers** (high scores)  
+            """)
+
+        # 🏆 **Business Insights (Dropdown)**
+        with st.expander("🏆 **Business Insights from This Visualization**"):
+            st.markdown("""
+            - If **negative sentiment customers (Cluster 0) are high**, you need to address **common complaints**.  
+            - If **positive sentiment customers (Cluster 2) dominate**, your product/service is well-received!  
+            - If **neutral sentiment customers (Cluster 1) are high**, focus on **enhancing their experience** to turn them into positive customers.  
+            """)
+
+        # 📋 **Sample Data with Sentiments**
+        st.subheader("📋 Sample Data with Sentiments & Clusters")
+        st.write(results.head(["Sentiment Score", "Cluster"]))
+
+        # 📥 **Download Option**
+        st.subheader("📥 Download Segmented Data")
+        csv = results.to_csv(["Sentiment Score", "Cluster"])
+        st.download_button("Download CSV", csv, "customer_segments.csv", "text/csv", key="download-segments",
+                           on_click="ignore")
+    else:
+        col1, col2 = st.columns(2)
+        default = st.session_state.get("customer_column")
+        customer_column = col1.selectbox("Customer ID column", other_columns,
+                                         index=other_columns.index(default) if default in other_columns else 0)
+        times = ["(review order)"] + [c for c in other_columns if c != customer_column]
+        default = st.session_state.get("time_column")
+        time_column = col2.selectbox("Trend over", times, index=times.index(default) if default in times else 0,
+                                     help="The trend is the slope of polarity over time (per 30 days), "
+                                          "or over each customer's reviews in file order (per review).")
+        time_column = None if time_column == "(review order)" else time_column
+
+        # Per-review scores, shared with the Sentiment, Intensity and Emotion pages
+        results.score("Sentiment Score", get_polarity)
+        results.score("Sentiment Intensity", get_sentiment_intensity)
+        results.score("Emotion", get_emotions)
+
+        # Rolled up in one chunked pass over the scores (bincounts over factorized IDs), then segmented
+        ids = df[customer_column]
+        params = {"customer": customer_column, "ids": results.column_fingerprint(customer_column), "time": time_column,
+                  "times": results.column_fingerprint(time_column) if time_column else None}
+        with st.spinner("Aggregating reviews per customer..."):
+            rollups = results.cached("Customer Rollups", lambda: customer_rollups(
+                results, ids, df[time_column] if time_column else None), **params)
+            segments = results.cached("Customer Segments", lambda: segment_customers(rollups, n_clusters=3),
+                                      n_clusters=3, **params)
+        st.write(f"👥 **{len(rollups):,} customers** from **{int(rollups['Reviews'].sum()):,} reviews** "
+                 f"(median {rollups['Reviews'].median():.0f} per customer)")
+
+        # 📊 **Customer Segment Distribution**
+        st.subheader("📊 Customer Segment Distribution")
+        profiles = segment_profiles(rollups, segments)
+        profiles["Segment"] = profiles["Segment"].astype(str)
+        fig = px.bar(profiles, x="Segment", y="Customers", title="Customer Segments Based on Sentiment", color="Segment")
+        st.plotly_chart(fig, width="stretch")
+
+        st.subheader("🧾 Segment Profiles")
+        st.write(profiles)
+
+        with st.expander("📈 **How to Interpret This Graph?**"):
+            st.markdown("""
+            - Each bar counts **customers** (not reviews) in a segment, clustered on their mean and lowest polarity,  
+              mean VADER intensity, trend and number of reviews.  
+            - **Segment 0** has the lowest average polarity, the last segment the highest.  
+            - A **negative trend** means the customer's reviews are getting more negative over time.  
+            """)
+
+        # 📋 **Sample Customers**
+        st.subheader("📋 Sample Customers with Segments")
+        table = rollups.assign(Segment=segments.to_numpy())
+        st.write(table.head())
+
+        # 📥 **Download Option**
+        st.subheader("📥 Download Customer Segments")
+        csv = results.cached("Customer Segments CSV", lambda: table.to_csv(index=False).encode("utf-8"), **params)
+        st.download_button("Download CSV", csv, "customer_rollup_segments.csv", "text/csv",
+                           key="download-customer-segments", on_click="ignore")
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from textblob import TextBlob
+from utils.analysis import get_polarity
+from utils.results import get_results
 
 st.markdown("<h1 style='text-align: center;'> 🛒 Product/Feature Sentiment Breakdown </h1>", unsafe_allow_html=True)
 
@@ -38,34 +39,39 @@ else:
 
     st.write(f"✅ **Analyzing Sentiment for Different Features in:** `{selected_column}`")
 
-    # Check if sentiment analysis was already computed
-    if "feature_sentiments" not in st.session_state:
+    # Compute once per dataset (cached by content, so a new upload is never served stale results);
+    # appended rows only add their own sums
+    def feature_sentiments(texts, weights):
         # Define features to analyze
         features = ["price", "quality", "service", "delivery", "experience"]
-        feature_sentiment = {feature: [] for feature in features}
+        feature_sentiment = {feature: [0.0, 0] for feature in features}  # weighted sum, weight
 
-        # Compute sentiment for each feature in reviews
-        for review in df[selected_column].dropna():
-            for feature in features:
-                if feature in review.lower():
-                    sentiment = TextBlob(review).sentiment.polarity
-                    feature_sentiment[feature].append(sentiment)
+        # Compute sentiment for each feature in reviews (one per near-duplicate cluster, weighted by its size)
+        for review, weight in zip(texts, weights):
+            if not isinstance(review, str):
+                continue
+            matched = [feature for feature in features if feature in review.lower()]
+            if matched:
+                sentiment = get_polarity(review)
+                for feature in matched:
+                    feature_sentiment[feature][0] += sentiment * weight
+                    feature_sentiment[feature][1] += weight
 
-        # Convert results to DataFrame
-        feature_sentiment_df = pd.DataFrame([
-            {"Feature": k, "Sentiment": sum(v) / len(v) if v else 0} for k, v in feature_sentiment.items()
-        ])
+        return pd.DataFrame([{"Feature": k, "Total": total, "Weight": count} for k, (total, count) in feature_sentiment.items()])
 
-        # Store results in session state
-        st.session_state.feature_sentiments = feature_sentiment_df
+    def add_sums(previous, added):
+        return previous.set_index("Feature").add(added.set_index("Feature"), fill_value=0).reset_index()
 
-    # Load results from session state
-    feature_sentiment_df = st.session_state.feature_sentiments
+    sums = get_results().accumulate("Feature Sentiment Sums", feature_sentiments, add_sums)
+
+    # Convert results to DataFrame
+    feature_sentiment_df = pd.DataFrame({"Feature": sums["Feature"],
+                                         "Sentiment": (sums["Total"] / sums["Weight"].where(sums["Weight"] > 0)).fillna(0)})
 
     # 📊 **Feature Sentiment Breakdown**
     st.subheader("📊 Feature Sentiment Breakdown")
     fig = px.bar(feature_sentiment_df, x="Feature", y="Sentiment", title="Feature Sentiment Breakdown", color="Feature")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, width="stretch")
 
     # 🧐 **Graph Interpretation & Insights**
     with st.expander("📈 **How to Interpret This Graph?**"):
@@ -88,4 +94,5 @@ else:
     # 📥 **Download Option**
     st.subheader("📥 Download Sentiment Data")
     csv = feature_sentiment_df.to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "feature_sentiment.csv", "text/csv", key="download-sentiments")
+    st.download_button("Download CSV", csv, "feature_sentiment.csv", "text/csv", key="download-sentiments",
+                       on_click="ignore")
@@ -1,11 +1,9 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from textblob import TextBlob
 import nltk
-from nltk.tokenize import sent_tokenize
-from nltk.corpus import stopwords
-from collections import defaultdict
+from utils.analysis import aspect_sentiment_analysis
+from utils.results import get_results
+from utils.chart_data import aspect_sentiment_counts
 
 nltk.download("punkt")
 nltk.download("stopwords")
@@ -39,56 +37,18 @@ else:
 
     st.write(f"✅ **Analyzing Aspects in Column:** `{selected_column}`")
 
-    # **Aspect Extraction & Sentiment Analysis**
-    def aspect_sentiment_analysis(text):
-        if not isinstance(text, str):
-            return {}
-
-        sentences = sent_tokenize(text)
-        aspect_sentiments = defaultdict(list)
-
-        for sentence in sentences:
-            analysis = TextBlob(sentence)
-            polarity = analysis.sentiment.polarity
-
-            # Simple aspect keyword mapping (customize this)
-            aspects = {
-                "battery": "Battery Life",
-                "camera": "Camera",
-                "service": "Customer Service",
-                "price": "Pricing",
-                "delivery": "Delivery Experience",
-                "design": "Design & Build",
-            }
-
-            for word in sentence.lower().split():
-                if word in aspects:
-                    sentiment = "Positive" if polarity > 0 else "Negative" if polarity < 0 else "Neutral"
-                    aspect_sentiments[aspects[word]].append(sentiment)
-
-        # Get the most common sentiment for each aspect
-        return {aspect: max(set(sentiments), key=sentiments.count) for aspect, sentiments in aspect_sentiments.items()}
-
     # Compute Aspect-Based Sentiment Analysis if not already stored
-    if "aspect_sentiment_results" not in st.session_state:
-        st.session_state.aspect_sentiment_results = df.copy()
-        st.session_state.aspect_sentiment_results["Aspect Sentiment"] = st.session_state.aspect_sentiment_results[selected_column].apply(aspect_sentiment_analysis)
-
-    df_result = st.session_state.aspect_sentiment_results  # Use stored results
+    results = get_results()
+    results.score("Aspect Sentiment", aspect_sentiment_analysis)
 
     # 📊 **Aspect Sentiment Distribution**
     st.subheader("📊 Aspect Sentiment Distribution")
 
-    aspect_data = []
-    for _, row in df_result.iterrows():
-        for aspect, sentiment in row["Aspect Sentiment"].items():
-            aspect_data.append({"Aspect": aspect, "Sentiment": sentiment})
+    aspect_df = results.aggregate("Aspect Sentiment", aspect_sentiment_counts)
 
-    aspect_df = pd.DataFrame(aspect_data)
-    
     if not aspect_df.empty:
-        fig = px.bar(aspect_df, x="Aspect", color="Sentiment", title="Aspect Sentiment Analysis", barmode="group")
-        st.plotly_chart(fig, use_container_width=True)
+        fig = px.bar(aspect_df, x="Aspect", y="Count", color="Sentiment", title="Aspect Sentiment Analysis", barmode="group")
+        st.plotly_chart(fig, width="stretch")
     else:
         st.error("🚨 No aspects were identified in the text.")
 
@@ -110,11 +70,10 @@ else:
 
     # 📋 **Sample Data with Aspect Sentiments**
     st.subheader("📋 Sample Data with Aspect Sentiment")
-    st.write(df_result[[selected_column, "Aspect Sentiment"]].head())
+    st.write(results.head(["Aspect Sentiment"]))
 
     # 📥 **Download Option**
     st.subheader("📥 Download Aspect Sentiment Data")
-    df_download = df_result[[selected_column, "Aspect Sentiment"]].copy()
-    df_download["Aspect Sentiment"] = df_download["Aspect Sentiment"].apply(lambda x: str(x))  # Convert dict to string
-    csv = df_download.to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "aspect_sentiment_analysis.csv", "text/csv", key="download-csv")
+    csv = results.to_csv(["Aspect Sentiment"])  # Dicts are written in their str() form
+    st.download_button("Download CSV", csv, "aspect_sentiment_analysis.csv", "text/csv", key="download-csv",
+                       on_click="ignore")
@@ -0,0 +1,95 @@
+import streamlit as st
+import plotly.express as px
+from utils.streaming import FileTailer, TrendAggregator
+
+st.markdown("<h1 style='text-align: center;'> 📡 Live Sentiment Trends </h1>", unsafe_allow_html=True)
+
+
+# 📌 **Feature Explanation Card**
+with st.expander("ℹ️ **What is Live Trend Monitoring?**", expanded=True):
+    st.markdown("""
+    Live Trend Monitoring **follows a CSV file (or a folder of CSV files)** that keeps growing during the day.
+
+    **What does it do?**
+    - Reads and scores **only the rows appended** since the last refresh.
+    - Keeps running totals per **time bucket** (sentiment share, average VADER intensity, emotion counts).
+
+    **Expected Output:**
+    - A **live trend chart** that updates automatically as new feedback arrives.
+    """)
+
+# ⚙️ **Stream Settings**
+source = st.text_input("Path to a CSV file or a folder of CSV files on the server", key="live_source")
+
+if not source:
+    st.info("ℹ️ Enter the path of the growing feedback file to start following it.")
+else:
+    tailer = FileTailer(source)
+    columns = tailer.columns()
+
+    if not columns:
+        st.warning("⚠️ No readable CSV file found at this path yet.")
+    else:
+        col1, col2 = st.columns(2)
+        text_column = col1.selectbox("Text column", columns)
+        time_column = col2.selectbox("Timestamp column", columns, index=min(1, len(columns) - 1))
+
+        col1, col2, col3 = st.columns(3)
+        freq = col1.selectbox("Time bucket", ["1min", "15min", "1h", "1D"], index=2)
+        window = col2.slider("Buckets to keep", min_value=6, max_value=168, value=48)
+        refresh = col3.slider("Refresh every (seconds)", min_value=2, max_value=60, value=10)
+        track_emotions = st.checkbox("Track emotions (slower)", value=True)
+
+        # Start over whenever the source or aggregation settings change
+        config = (source, text_column, time_column, freq, window, track_emotions)
+        if st.session_state.get("live_stream", {}).get("config") != config:
+            st.session_state.live_stream = {
+                "config": config,
+                "tailer": tailer,
+                "aggregator": TrendAggregator(freq=freq, window=window, emotions=track_emotions),
+            }
+
+        @st.fragment(run_every=refresh)
+        def live_trends():
+            stream = st.session_state.live_stream
+            aggregator = stream["aggregator"]
+
+            new_rows = stream["tailer"].poll()
+            scored = aggregator.update(new_rows, text_column, time_column) if not new_rows.empty else 0
+
+            st.write(f"✅ **Rows scored:** {aggregator.rows:,} (+{scored:,} new) · "
+                     f"**Skipped (bad timestamp):** {aggregator.skipped:,}")
+
+            if aggregator.rows == 0:
+                st.info("⏳ Waiting for rows with a valid timestamp...")
+                return
+
+            # 📊 **Sentiment Share Over Time**
+            st.subheader("📊 Sentiment Share Over Time")
+            share = aggregator.sentiment_share().reset_index().melt(id_vars="Time", var_name="Sentiment", value_name="Share")
+            fig = px.area(share, x="Time", y="Share", color="Sentiment", title="Sentiment Share per Time Bucket")
+            st.plotly_chart(fig, width="stretch")
+
+            # 📈 **Average Intensity Over Time**
+            st.subheader("📈 Average VADER Intensity")
+            intensity = aggregator.mean_intensity().rename("Mean Intensity").reset_index()
+            fig = px.line(intensity, x="Time", y="Mean Intensity", markers=True, title="Mean Compound Score per Time Bucket")
+            fig.update_yaxes(range=[-1, 1])
+            st.plotly_chart(fig, width="stretch")
+
+            # 😊 **Emotion Counts Over Time**
+            if aggregator.emotions:
+                st.subheader("😊 Emotions Over Time")
+                emotions = aggregator.emotions_by_bucket().reset_index().melt(id_vars="Time", var_name="Emotion", value_name="Count")
+                fig = px.bar(emotions, x="Time", y="Count", color="Emotion", title="Emotion Counts per Time Bucket")
+                st.plotly_chart(fig, width="stretch")
+
+        live_trends()
+
+        # 📈 **Graph Interpretation**
+        with st.expander("📈 **How to Interpret These Charts?**"):
+            st.markdown("""
+            - Each point is one **time bucket** of the selected size.
+            - A **growing negative share** or a **falling average intensity** signals an emerging problem.
+            - Only the most recent buckets are kept, so memory stays constant however long the stream runs.
+            """)
@@ -1,10 +1,18 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-
-# Initialize Sentiment Intensity Analyzer
-analyzer = SentimentIntensityAnalyzer()
+from utils.analysis import get_sentiment_intensity
+from utils.results import get_results
+from utils.chart_data import histogram_figure
+
+# (band, lower edge) on the VADER compound scale; ±0.05 is VADER's usual neutral cut-off
+INTENSITY_BANDS = [
+    ("Strongly Negative", -1.0),
+    ("Negative", -0.5),
+    ("Neutral", -0.05),
+    ("Positive", 0.05),
+    ("Strongly Positive", 0.5),
+]
 
 st.markdown("<h1 style='text-align: center;'> 📊 Sentiment Intensity Analysis </h1>", unsafe_allow_html=True)
 
@@ -38,27 +46,30 @@ else:
 
     st.write(f"✅ **Analyzing Sentiment Intensity for Column:** `{selected_column}`")
 
-    # **Sentiment Intensity Analysis Function**
-    def get_sentiment_intensity(text):
-        if isinstance(text, str):  # Ensure text is a string
-            scores = analyzer.polarity_scores(text)
-            return scores["compound"]  # Compound score represents overall sentiment intensity
-        return 0  # Default neutral score for missing values
-
     # Compute Sentiment Intensity if not already stored
-    if "sentiment_intensity_results" not in st.session_state:
-        st.session_state.sentiment_intensity_results = df.copy()
-        st.session_state.sentiment_intensity_results["Sentiment Intensity"] = st.session_state.sentiment_intensity_results[selected_column].apply(get_sentiment_intensity)
-
-    df_result = st.session_state.sentiment_intensity_results  # Use stored results
+    results = get_results()
+    results.score("Sentiment Intensity", get_sentiment_intensity)
 
     # 📊 **Sentiment Intensity Distribution**
     st.subheader("📊 Sentiment Intensity Distribution")
 
-    if "Sentiment Intensity" in df_result.columns:  # Ensure Sentiment column exists before plotting
-        fig = px.histogram(df_result, x="Sentiment Intensity", nbins=30, title="Sentiment Intensity Distribution", 
-                           color_discrete_sequence=["#636EFA"])
-        st.plotly_chart(fig, use_container_width=True)
+    if "Sentiment Intensity" in results:  # Ensure Sentiment column exists before plotting
+        # Bins come from the column's quantile sketch; the figure only carries 30 bars
+        sketch = results.sketch("Sentiment Intensity")
+        fig = histogram_figure(sketch.histogram(30), "Sentiment Intensity", "Sentiment Intensity Distribution",
+                               color_discrete_sequence=["#636EFA"])
+        st.plotly_chart(fig, width="stretch")
+
+        # 🎚️ **Intensity Bands & Percentiles** (constant memory, whatever the number of rows)
+        st.subheader("🎚️ Intensity Bands")
+        counts = sketch.band_counts([edge for _, edge in INTENSITY_BANDS] + [1.0])
+        bands = pd.DataFrame({"Band": [name for name, _ in INTENSITY_BANDS], "Rows": counts,
+                              "Share": counts / max(sketch.count, 1)})
+        st.write(bands.style.format({"Rows": "{:,}", "Share": "{:.1%}"}))
+
+        percentiles = [5, 25, 50, 75, 95]
+        cuts = sketch.quantile([p / 100 for p in percentiles])
+        st.write(pd.DataFrame({"Percentile": [f"P{p}" for p in percentiles], "Intensity": np.round(cuts, 3)}))
     else:
         st.error("🚨 Error: Sentiment intensity analysis was not computed correctly.")
 
@@ -80,9 +91,10 @@ else:
 
     # 📋 **Sample Data with Sentiment Intensity Scores**
     st.subheader("📋 Sample Data with Sentiment Intensity Scores")
-    st.write(df_result[[selected_column, "Sentiment Intensity"]].head())
+    st.write(results.head(["Sentiment Intensity"]))
 
     # 📥 **Download Option**
     st.subheader("📥 Download Sentiment Intensity Data")
-    csv = df_result[[selected_column, "Sentiment Intensity"]].to_csv(index=False).encode("utf-8")
-    st.download_button("Download CSV", csv, "sentiment_intensity_analysis.csv", "text/csv", key="download-csv")
+    csv = results.to_csv(["Sentiment Intensity"])
+    st.download_button("Download CSV", csv, "sentiment_intensity_analysis.csv", "text/csv", key="download-csv",
+                       on_click="ignore")
@@ -0,0 +1,131 @@
+from collections import defaultdict
+
+from textblob import TextBlob
+from nrclex import NRCLex
+from nltk.tokenize import sent_tokenize
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from utils.lexicon_bundle import NRC_EMOTIONS, open_bundle
+
+# Text analyzers shared by the dashboard pages and the scoring service.
+# Each one takes a single text and returns a JSON-serialisable value.
+
+# Simple aspect keyword mapping (customize this)
+ASPECTS = {
+    "battery": "Battery Life",
+    "camera": "Camera",
+    "service": "Customer Service",
+    "price": "Pricing",
+    "delivery": "Delivery Experience",
+    "design": "Design & Build",
+}
+
+_vader = None
+_lexicons = None  # LexiconBundle, or False when no (matching) bundle has been built
+
+
+def get_lexicons():
+    # Memory-mapped lexicon bundle shared by all processes (python -m utils.lexicon_bundle build)
+    global _lexicons
+    if _lexicons is None:
+        _lexicons = open_bundle() or False
+    return _lexicons or None
+
+
+def get_vader():
+    # VADER parses its lexicon on construction, so build it once per process
+    global _vader
+    if _vader is None:
+        bundle = get_lexicons()
+        _vader = bundle.vader() if bundle else SentimentIntensityAnalyzer()
+    return _vader
+
+
+def pattern_polarity(text):
+    # TextBlob(text).sentiment.polarity, from the bundle when there is one
+    bundle = get_lexicons()
+    return bundle.pattern_sentiment()(text)[0] if bundle else TextBlob(text).sentiment.polarity
+
+
+def top_emotion(text):
+    bundle = get_lexicons()
+    if not bundle:
+        emotions = NRCLex(text).top_emotions
+        return max(emotions, key=lambda x: x[1])[0] if emotions else "Neutral"
+    # Same tokens and tie order as NRCLex: lemmatized TextBlob words, first emotion with the highest count
+    lexicon = bundle.nrc_lexicon()
+    counts = dict.fromkeys(NRC_EMOTIONS, 0)
+    for word in TextBlob(text).words:
+        word = word.lemmatize()
+        if word in lexicon:
+            for emotion in lexicon[word]:
+                counts[emotion] += 1
+    return max(counts, key=counts.get)
+
+
+def warm_analyzers():
+    # Worker-process initializer: open the bundle (or parse the lexicons) before the first request
+    get_vader()
+    pattern_polarity("warm up")
+
+
+def polarity_label(polarity):
+    return "Positive" if polarity > 0 else "Negative" if polarity < 0 else "Neutral"
+
+
+def get_polarity(text):
+    if isinstance(text, str):  # Ensure text is a string
+        return pattern_polarity(text)
+    return 0.0
+
+
+def get_sentiment(text):
+    if isinstance(text, str):
+        return polarity_label(pattern_polarity(text))
+    return "Neutral"
+
+
+def get_emotions(text):
+    if isinstance(text, str):
+        return top_emotion(text)
+    return "Neutral"
+
+
+def get_sentiment_intensity(text):
+    if isinstance(text, str):
+        scores = get_vader().polarity_scores(text)
+        return scores["compound"]  # Compound score represents overall sentiment intensity
+    return 0.0  # Default neutral score for missing values
+
+
+def aspect_sentiment_analysis(text):
+    if not isinstance(text, str):
+        return {}
+
+    sentences = sent_tokenize(text)
+    aspect_sentiments = defaultdict(list)
+
+    for sentence in sentences:
+        polarity = pattern_polarity(sentence)
+
+        for word in sentence.lower().split():
+            if word in ASPECTS:
+                aspect_sentiments[ASPECTS[word]].append(polarity_label(polarity))
+
+    # Get the most common sentiment for each aspect
+    return {aspect: max(set(sentiments), key=sentiments.count) for aspect, sentiments in aspect_sentiments.items()}
+
+
+ANALYZERS = {
+    "polarity": get_polarity,
+    "sentiment": get_sentiment,
+    "vader": get_sentiment_intensity,
+    "emotion": get_emotions,
+    "aspects": aspect_sentiment_analysis,
+}
+
+
+def score_batch(analyzer, texts):
+    # Module-level so it can be shipped to worker processes
+    func = ANALYZERS[analyzer]
+    return [func(text) for text in texts]
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# Server-side aggregation for charts: Plotly receives bins and counts, never raw rows,
+# so the figure payload stays the same size however many rows were analysed.
+# Use through ResultStore.aggregate(name, func, **params) to memoize per result.
+
+
+def category_counts(values):
+    counts = pd.Series(values).value_counts(sort=True)
+    return pd.DataFrame({values.name or "Value": np.asarray(counts.index), "Count": counts.to_numpy()})
+
+
+def aspect_sentiment_counts(values):
+    counts = {}
+    for aspect_sentiments in values:
+        for aspect, sentiment in aspect_sentiments.items():
+            counts[(aspect, sentiment)] = counts.get((aspect, sentiment), 0) + 1
+    return pd.DataFrame([(a, s, c) for (a, s), c in counts.items()], columns=["Aspect", "Sentiment", "Count"])
+
+
+def merge_counts(previous, added):
+    # Counts of the earlier rows plus counts of appended rows (for category/aspect counts)
+    keys = [column for column in previous.columns if column != "Count"]
+    merged = pd.concat([previous, added]).groupby(keys, sort=False)["Count"].sum().reset_index()
+    return merged.sort_values("Count", ascending=False, kind="stable", ignore_index=True)
+
+
+def histogram_figure(hist, x_label, title, **kwargs):
+    fig = px.bar(hist, x="Bin Center", y="Count", title=title, hover_data=["Bin Start", "Bin End"], **kwargs)
+    fig.update_traces(width=(hist["Bin End"] - hist["Bin Start"]).to_numpy())  # Bars span their bin
+    fig.update_layout(bargap=0, xaxis_title=x_label)
+    return fig
@@ -0,0 +1,121 @@
+import re
+import zlib
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Near-duplicate grouping with MinHash signatures and LSH banding.
+# Templated reviews and bot spam that differ only by a name or an order number end up
+# in one cluster; pages then analyse one representative per cluster and broadcast
+# the result back to every member (the cluster size is the representative's weight).
+
+NUM_PERM = 64
+PRIME = 4_294_967_291  # Largest prime below 2**32
+SHINGLE = 3  # Words per shingle
+CHUNK_SHINGLES = 200_000  # Bounds the (NUM_PERM x shingles) working matrix
+
+
+class DedupResult:
+    def __init__(self, cluster, representatives, weights, threshold):
+        self.cluster = cluster  # Row position -> cluster id
+        self.representatives = representatives  # Cluster id -> row position of its representative
+        self.weights = weights  # Cluster id -> number of rows in the cluster
+        self.threshold = threshold
+
+    @property
+    def n_rows(self):
+        return len(self.cluster)
+
+    @property
+    def n_clusters(self):
+        return len(self.representatives)
+
+    @property
+    def removed_fraction(self):
+        return 1 - self.n_clusters / self.n_rows if self.n_rows else 0.0
+
+
+def _normalize(text):
+    text = re.sub(r"\d+", " ", str(text).lower())  # Order numbers, dates, amounts
+    return re.findall(r"\w+", text)
+
+
+def _shingle_hashes(text):
+    tokens = _normalize(text)
+    if len(tokens) >= SHINGLE:
+        shingles = {" ".join(tokens[i:i + SHINGLE]) for i in range(len(tokens) - SHINGLE + 1)}
+    else:
+        shingles = {" ".join(tokens)}  # Short (or empty) texts hash as a whole
+    return [zlib.crc32(s.encode("utf-8")) for s in shingles]
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=42):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=(num_perm, 1), dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    shingles = [_shingle_hashes(text) for text in texts]
+    signatures = np.empty((len(shingles), num_perm), dtype=np.uint32)
+    start = 0
+    while start < len(shingles):
+        # Take as many documents as fit in one vectorised block
+        end, size = start, 0
+        while end < len(shingles) and (size == 0 or size + len(shingles[end]) <= CHUNK_SHINGLES):
+            size += len(shingles[end])
+            end += 1
+        lengths = np.fromiter((len(s) for s in shingles[start:end]), dtype=np.int64, count=end - start)
+        hashes = np.fromiter((h for s in shingles[start:end] for h in s), dtype=np.uint64, count=size)
+        permuted = (a * hashes + b) % PRIME  # (num_perm, shingles): a*h + b < 2**64, no overflow
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def _bands_for(threshold, num_perm):
+    # Pick the banding whose S-curve midpoint (1/b)^(1/r) is closest to the threshold
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+def find_near_duplicates(texts, threshold=0.8, num_perm=NUM_PERM):
+    texts = list(texts)
+    n = len(texts)
+    if n == 0:
+        return DedupResult(np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.int64), threshold)
+
+    signatures = minhash_signatures(texts, num_perm)
+    bands, rows = _bands_for(threshold, num_perm)
+    mixer = np.random.default_rng(7).integers(1, 2**63, size=rows, dtype=np.uint64)
+
+    sources, targets = [], []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = (block * mixer).sum(axis=1)  # Wrapping 64-bit mix of the band's rows
+        _, bucket = np.unique(keys, return_inverse=True)
+        order = np.argsort(bucket, kind="stable")
+        sorted_buckets = bucket[order]
+        leader_pos = np.searchsorted(sorted_buckets, sorted_buckets, side="left")
+        leaders = order[leader_pos]
+        candidates = leaders != order
+        docs, heads = order[candidates], leaders[candidates]
+        # Verify candidate pairs against the estimated Jaccard similarity
+        similar = (signatures[docs] == signatures[heads]).mean(axis=1) >= threshold
+        sources.append(docs[similar])
+        targets.append(heads[similar])
+
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    graph = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+
+    # Renumber clusters by first appearance; the first row of each cluster represents it
+    _, representatives, cluster = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.argsort(representatives, kind="stable")
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    cluster = remap[cluster]
+    representatives = representatives[order]
+    weights = np.bincount(cluster, minlength=len(representatives))
+    return DedupResult(cluster.astype(np.int64), representatives.astype(np.int64), weights, threshold)
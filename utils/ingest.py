@@ -0,0 +1,132 @@
+import os
+import re
+import hashlib
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+# Excel ingestion through a one-time columnar conversion.
+# A sheet is streamed row by row with openpyxl's read-only mode and written to a
+# Parquet file named after the workbook's content hash; later loads of the same
+# workbook (by any session) read the Parquet file, optionally only a few columns.
+
+CACHE_DIR = Path(os.environ.get("SENTIMENT_AI_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache")) / "ingest"
+BATCH_ROWS = 50_000
+
+
+def content_hash(file, block_size=2**20):
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(block_size), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def excel_sheet_names(file):
+    file.seek(0)
+    workbook = load_workbook(file, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+        file.seek(0)
+
+
+def cached_parquet_path(file, sheet=None):
+    # The slug is only a readable prefix ("Q1 2024" and "Q1_2024" share it); the hash of the exact
+    # sheet name keeps them apart. No sheet (the first one) gets a tag no hash can produce.
+    if sheet:
+        slug = re.sub(r"[^\w-]", "_", sheet)
+        tag = hashlib.sha256(sheet.encode("utf-8")).hexdigest()[:16]
+    else:
+        slug, tag = "first-sheet", "default"
+    return CACHE_DIR / f"{content_hash(file)}-{slug}-{tag}.parquet"
+
+
+def read_excel_cached(file, sheet=None, columns=None):
+    path = cached_parquet_path(file, sheet)
+    if not path.exists():
+        convert_sheet(file, path, sheet)
+    return pd.read_parquet(path, columns=columns)
+
+
+def convert_sheet(file, path, sheet=None):
+    file.seek(0)
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        names = _column_names(next(rows, ()))
+        chunks = {name: [] for name in names}
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_ROWS:
+                _append_batch(chunks, names, batch)
+                batch = []
+        _append_batch(chunks, names, batch)
+    finally:
+        workbook.close()
+        file.seek(0)
+
+    table = pa.table({name: _combine(parts) for name, parts in chunks.items()})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so concurrent sessions never read a partial file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def _column_names(header):
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = str(value) if value is not None else f"Unnamed: {i}"
+        if name in seen:  # Mirror pandas' "name.1" de-duplication
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _append_batch(chunks, names, batch):
+    if not batch:
+        return
+    for i, name in enumerate(names):
+        chunks[name].append(_to_arrow([row[i] if i < len(row) else None for row in batch]))
+
+
+def _to_arrow(values):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):  # Mixed cell types: keep them as text
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _combine(parts):
+    # Batches may have inferred different types (e.g. all-empty, int vs float); reconcile them
+    if not parts:
+        return pa.array([], type=pa.null())
+    types = {part.type for part in parts if part.type != pa.null()}
+    if not types:
+        target = pa.null()
+    elif len(types) == 1:
+        target = types.pop()
+    elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        target = pa.float64()
+    else:
+        target = pa.string()
+    return pa.chunked_array([pc.cast(part, target) for part in parts], type=target)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from utils.shared_cache import get_shared_cache
+
+# Label-conditioned keyword statistics from a single sparse document-term matrix.
+# The matrix is built once per dataset; per-class term counts for any label column
+# (sentiment, emotion, cluster, topic) are one sparse product G @ X, where G is the
+# class-indicator matrix, and every slice after that is a lookup.
+
+LABEL_COLUMNS = ["Sentiment", "Emotion", "Cluster", "Topic"]
+
+
+def document_term_matrix(texts, max_features=20_000, stop_words="english", min_df=2):
+    vectorizer = CountVectorizer(stop_words=stop_words, max_features=max_features, min_df=min_df)
+    try:
+        X = vectorizer.fit_transform(texts.fillna("").astype(str))
+    except ValueError:  # min_df pruned everything (tiny dataset)
+        vectorizer = CountVectorizer(stop_words=stop_words, max_features=max_features)
+        X = vectorizer.fit_transform(texts.fillna("").astype(str))
+    return X.tocsr(), vectorizer.get_feature_names_out()
+
+
+def class_term_counts(X, labels, weights=None):
+    labels = pd.Series(labels).reset_index(drop=True)
+    present = labels.notna().to_numpy()
+    codes, classes = pd.factorize(labels[present], sort=True)
+    rows = np.flatnonzero(present)
+    values = np.ones(len(rows)) if weights is None else np.asarray(weights, dtype=np.float64)[rows]
+    G = sparse.csr_matrix((values, (codes, rows)), shape=(len(classes), X.shape[0]))
+    counts = np.asarray((G @ X).todense())  # (classes x terms) group sums
+    return list(classes), counts
+
+
+def log_odds(counts, prior_strength=500.0):
+    # Log-odds ratio with an informative Dirichlet prior (Monroe et al.), class vs. rest, as z-scores
+    totals = counts.sum(axis=0)
+    alpha = prior_strength * (totals + 1) / (totals + 1).sum()
+    alpha0 = alpha.sum()
+    class_totals = counts.sum(axis=1, keepdims=True)
+    rest = totals - counts
+    rest_totals = class_totals.sum() - class_totals
+    delta = (np.log((counts + alpha) / (class_totals + alpha0 - counts - alpha))
+             - np.log((rest + alpha) / (rest_totals + alpha0 - rest - alpha)))
+    variance = 1 / (counts + alpha) + 1 / (rest + alpha)
+    return delta / np.sqrt(variance)
+
+
+def chi_square(counts):
+    # 2x2 chi-square of term occurrence, class vs. rest, signed by over/under-representation
+    totals = counts.sum(axis=0)
+    class_totals = counts.sum(axis=1, keepdims=True)
+    n = class_totals.sum()
+    a = counts
+    b = class_totals - a
+    c = totals - a
+    d = n - class_totals - c
+    denominator = (a + b) * (c + d) * (a + c) * (b + d)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = n * (a * d - b * c) ** 2 / denominator
+    score = np.nan_to_num(score)
+    return np.where(a * d >= b * c, score, -score)
+
+
+SCORERS = {"Log-odds (z)": log_odds, "Chi-square": chi_square}
+
+
+def keyword_table(terms, classes, counts, label, method="Log-odds (z)", top=20):
+    i = classes.index(label)
+    scores = SCORERS[method](counts)[i]
+    best = np.argsort(scores)[::-1][:top]
+    return pd.DataFrame({"Word": terms[best], "Count": counts[i, best], "Score": scores[best]})
+
+
+def keyword_counts(results, label_column):
+    # Document-term matrix once per dataset (and near-duplicate setting), class counts once per label column
+    def build_matrix():
+        return document_term_matrix(results.representative_texts())
+
+    X, terms = results.cached("Document-Term Matrix", build_matrix)
+
+    def count_classes():
+        labels = results.get(label_column)
+        if results.dedup is not None:
+            labels = labels.iloc[results.dedup.representatives]
+        classes, counts = class_term_counts(X, labels, results.representative_weights())
+        return terms, classes, counts
+
+    # The column token already covers the dataset, the analysis parameters and the dedup setting
+    return get_shared_cache().get_or_compute(("keywords", results.token(label_column)), count_classes)
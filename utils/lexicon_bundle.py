@@ -0,0 +1,292 @@
+import os
+import json
+import argparse
+import tempfile
+import warnings
+from pathlib import Path
+from functools import lru_cache
+from collections.abc import Mapping
+from importlib.metadata import version, PackageNotFoundError
+
+import numpy as np
+
+# The VADER, NRC and TextBlob (pattern) lexicons compiled into one binary file.
+# Each lexicon is a sorted fixed-width key array plus value arrays; a process opens
+# the file with np.memmap and looks words up with a binary search, so worker processes
+# share the same read-only pages instead of each parsing text files into dicts.
+#
+#   python -m utils.lexicon_bundle build      # once per deployment (or after upgrading the packages)
+#
+# utils.analysis uses the bundle when it exists and matches the installed packages.
+
+BUNDLE_PATH = Path(os.environ.get(
+    "SENTIMENT_AI_LEXICON_BUNDLE",
+    Path(os.environ.get("SENTIMENT_AI_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache")) / "lexicons.bin",
+))
+MAGIC = b"SAILEX1\n"
+ALIGN = 64
+HOT_WORDS = 16_384  # Per-lexicon lookup cache: frequent words resolve at dict speed
+SOURCES = ("vaderSentiment", "NRCLex", "textblob")
+POS_SEPARATOR = "\x1f"  # TextBlob keys are "word<sep>pos"; it sorts before any printable character
+NRC_EMOTIONS = ("fear", "anger", "anticipation", "trust", "surprise", "positive", "negative", "sadness", "disgust", "joy")
+
+
+def package_versions():
+    versions = {}
+    for name in SOURCES:
+        try:
+            versions[name] = version(name)
+        except PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+# ---- Build -------------------------------------------------------------------------
+
+def _vader_lexicons():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    analyzer = SentimentIntensityAnalyzer()
+    return analyzer.lexicon, analyzer.emojis
+
+
+def _nrc_lexicon():
+    import nrclex
+    path = next(Path(nrclex.__file__).parent.rglob("nrc_en.json"))
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _pattern_lexicon():
+    from textblob.en import sentiment
+    len(sentiment)  # Forces the lazy XML load (including the derived "-ly" adverbs)
+    return dict(dict.items(sentiment)), dict(sentiment.labeler)
+
+
+def _sorted_keys(keys):
+    encoded = sorted(key.encode("utf-8") for key in keys)
+    width = max((len(key) for key in encoded), default=1)
+    return np.array(encoded, dtype=f"S{width}"), [key.decode("utf-8") for key in encoded]
+
+
+def _strings(values):
+    blobs = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.uint64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(blobs), dtype=np.uint8)
+
+
+def _sections():
+    vader, emojis = _vader_lexicons()
+    nrc = _nrc_lexicon()
+    senses, labels = _pattern_lexicon()
+
+    keys, order = _sorted_keys(vader)
+    yield "vader", {"keys": keys, "values": np.array([vader[k] for k in order], dtype=np.float64)}
+
+    keys, order = _sorted_keys(emojis)
+    offsets, blob = _strings(emojis[k] for k in order)
+    yield "vader_emoji", {"keys": keys, "offsets": offsets, "blob": blob}
+
+    keys, order = _sorted_keys(nrc)
+    bits = {emotion: 1 << i for i, emotion in enumerate(NRC_EMOTIONS)}
+    masks = [sum(bits.get(e, 0) for e in set(nrc[k])) for k in order]
+    yield "nrc", {"keys": keys, "values": np.array(masks, dtype=np.uint16)}
+
+    entries = {f"{word}{POS_SEPARATOR}{pos or ''}": psi for word, by_pos in senses.items() for pos, psi in by_pos.items()}
+    keys, order = _sorted_keys(entries)
+    yield "textblob", {"keys": keys, "values": np.array([entries[k] for k in order], dtype=np.float64).reshape(-1, 3)}
+
+    keys, order = _sorted_keys(labels)
+    offsets, blob = _strings(labels[k] for k in order)
+    yield "textblob_labels", {"keys": keys, "offsets": offsets, "blob": blob}
+
+
+def build_bundle(path=BUNDLE_PATH):
+    toc, arrays, offset = {"versions": package_versions(), "sections": {}}, [], 0
+    for name, parts in _sections():
+        toc["sections"][name] = {}
+        for part, array in parts.items():
+            array = np.ascontiguousarray(array)
+            toc["sections"][name][part] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+            arrays.append((offset, array))
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+
+    header = json.dumps(toc).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(MAGIC + np.uint64(len(header)).tobytes() + header)
+        for array_offset, array in arrays:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)  # Readers never see a half-written bundle
+    return path
+
+
+# ---- Read --------------------------------------------------------------------------
+
+class LexiconMapping(Mapping):
+    # Read-only dict view of one section; values are decoded from the mapped arrays on lookup
+    def __init__(self, keys, decode):
+        self._keys = keys
+        self._width = keys.dtype.itemsize
+        self._decode = decode
+        self._find = lru_cache(maxsize=HOT_WORDS)(self._search)
+
+    def _search(self, key):
+        encoded = key.encode("utf-8") if isinstance(key, str) else None
+        if encoded is None or not encoded or len(encoded) > self._width:
+            return -1
+        i = int(np.searchsorted(self._keys, encoded))
+        return i if i < len(self._keys) and self._keys[i] == encoded else -1
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._decode(i)
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return (key.decode("utf-8") for key in self._keys)
+
+
+class LexiconBundle:
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = Path(path)
+        self._raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if bytes(self._raw[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a lexicon bundle")
+        size = int(self._raw[len(MAGIC):len(MAGIC) + 8].view(np.uint64)[0])
+        start = len(MAGIC) + 8
+        self.toc = json.loads(bytes(self._raw[start:start + size]).decode("utf-8"))
+        self._data_start = -(-(start + size) // ALIGN) * ALIGN
+        self._pattern = None
+
+    @property
+    def versions(self):
+        return self.toc["versions"]
+
+    def array(self, section, part):
+        spec = self.toc["sections"][section][part]
+        dtype = np.dtype(spec["dtype"])
+        start = self._data_start + spec["offset"]
+        count = int(np.prod(spec["shape"]))
+        return self._raw[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    def _strings(self, section):
+        offsets, blob = self.array(section, "offsets"), self.array(section, "blob")
+        return lambda i: bytes(blob[int(offsets[i]):int(offsets[i + 1])]).decode("utf-8")
+
+    def vader_lexicon(self):
+        values = self.array("vader", "values")
+        return LexiconMapping(self.array("vader", "keys"), lambda i: float(values[i]))
+
+    def vader_emojis(self):
+        return LexiconMapping(self.array("vader_emoji", "keys"), self._strings("vader_emoji"))
+
+    def nrc_lexicon(self):
+        masks = self.array("nrc", "values")
+        return LexiconMapping(self.array("nrc", "keys"),
+                              lambda i: [e for bit, e in enumerate(NRC_EMOTIONS) if int(masks[i]) >> bit & 1])
+
+    def vader(self):
+        # A SentimentIntensityAnalyzer that reads the mapped lexicons instead of parsing its text files
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+        analyzer.lexicon = self.vader_lexicon()
+        analyzer.emojis = self.vader_emojis()
+        return analyzer
+
+    def pattern_sentiment(self):
+        if self._pattern is None:
+            self._pattern = _bundled_pattern_sentiment(self)
+        return self._pattern
+
+
+def _bundled_pattern_sentiment(bundle):
+    import textblob.en as en
+
+    keys, values = bundle.array("textblob", "keys"), bundle.array("textblob", "values")
+    labels = LexiconMapping(bundle.array("textblob_labels", "keys"), bundle._strings("textblob_labels"))
+
+    @lru_cache(maxsize=HOT_WORDS)
+    def senses_of(word):
+        if not isinstance(word, str):
+            return None
+        prefix = f"{word}{POS_SEPARATOR}".encode("utf-8")
+        if len(prefix) > keys.dtype.itemsize:
+            return None
+        lo = int(np.searchsorted(keys, prefix))
+        hi = int(np.searchsorted(keys, prefix[:-1] + b"\x20"))  # First key past the "word<sep>" range
+        if lo == hi:
+            return None
+        return {keys[i][len(prefix):].decode("utf-8") or None: [float(v) for v in values[i]] for i in range(lo, hi)}
+
+    class BundledSentiment(en.Sentiment):
+        # textblob.en.sentiment with the word -> {pos: (polarity, subjectivity, intensity)} table read from the bundle
+        def load(self, path=None):
+            pass
+
+        def __contains__(self, word):
+            return senses_of(word) is not None
+
+        def __getitem__(self, word):
+            senses = senses_of(word)
+            if senses is None:
+                raise KeyError(word)
+            return senses
+
+        def __len__(self):
+            return len(keys)
+
+    sentiment = BundledSentiment(
+        path="",
+        synset="wordnet_id",
+        negations=("no", "not", "n't", "never"),
+        modifiers=("RB",),
+        modifier=lambda w: w.endswith("ly"),
+        tokenizer=en.parser.find_tokens,
+        language="en",
+    )
+    sentiment.labeler = labels
+    return sentiment
+
+
+def open_bundle(path=BUNDLE_PATH):
+    # The bundle, or None when it is missing or was built from other package versions
+    if not Path(path).exists():
+        return None
+    bundle = LexiconBundle(path)
+    if bundle.versions != package_versions():
+        warnings.warn(f"Ignoring {path}: built for {bundle.versions}, installed {package_versions()}. "
+                      f"Rebuild with `python -m utils.lexicon_bundle build`.", stacklevel=2)
+        return None
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the sentiment lexicons into a memory-mappable bundle.")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--output", default=str(BUNDLE_PATH))
+    args = parser.parse_args()
+
+    if args.command == "build":
+        path = build_bundle(args.output)
+        print(f"Wrote {path} ({path.stat().st_size / 2**20:.1f} MB)")
+    bundle = LexiconBundle(args.output)
+    print(json.dumps(bundle.versions))
+    for name, parts in bundle.toc["sections"].items():
+        print(f"{name:16s} {parts['keys']['shape'][0]:>7,} entries")
+
+
+if __name__ == "__main__":
+    main()
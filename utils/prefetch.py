@@ -0,0 +1,118 @@
+import os
+import time
+import queue
+import itertools
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+import pandas as pd
+from joblib import Parallel, delayed
+
+from utils.analysis import score_batch
+from utils.shared_cache import get_shared_cache
+from utils.topic_registry import fit_topics
+
+# Opt-in background precompute of the analyses a user is about to open.
+# Once a text column is selected, Home.py queues one job per enabled analysis; a
+# single dispatcher thread runs them in priority order (across all sessions) and
+# scores texts in worker processes (joblib), so at most PREFETCH_WORKERS cores are busy.
+# Results land in the shared cache under the keys the pages look up: a page finds
+# them ready, attaches to the one being computed, or computes a queued one itself.
+
+PREFETCH_WORKERS = int(os.environ.get("SENTIMENT_AI_PREFETCH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+CHUNK_TEXTS = 2_000
+DEFAULT_TOPICS = 3  # The Topic Modeling page's default
+RETRY_AFTER = 60  # Seconds before a failed job may be queued again
+MAX_FAILURES = 256  # Failed jobs remembered (for their status), most recent kept
+
+# Analysis -> (priority, page analyzer in utils.analysis.ANALYZERS, or None for the topic model)
+ANALYSES = {
+    "Sentiment": (0, "sentiment"),
+    "Sentiment Intensity": (1, "vader"),
+    "Emotion": (2, "emotion"),
+    "Topic": (3, None),
+    "Sentiment Score": (4, "polarity"),
+    "Aspect Sentiment": (5, "aspects"),
+}
+DEFAULT_ANALYSES = ["Sentiment", "Sentiment Intensity", "Emotion", "Topic"]
+
+
+class PrefetchScheduler:
+    def __init__(self, cache, workers=PREFETCH_WORKERS):
+        self.cache = cache
+        self.workers = workers
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()  # FIFO among jobs of equal priority
+        self._lock = threading.Lock()
+        self._jobs = {}  # key -> "queued" / "running"; finished jobs are removed
+        self._failures = OrderedDict()  # key -> ("failed (...)", time), oldest first
+        self._thread = None
+
+    def submit(self, key, priority, compute):
+        with self._lock:
+            if key in self._jobs or self.cache.state(key) is not None:
+                return  # Queued, running or already cached
+            failure = self._failures.get(key)
+            if failure is not None and time.monotonic() - failure[1] < RETRY_AFTER:
+                return  # Failed just now (the page will surface the error); retried later
+            self._failures.pop(key, None)
+            self._jobs[key] = "queued"
+            self._queue.put((priority, next(self._order), key, compute))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, name="prefetch", daemon=True)
+                self._thread.start()
+
+    def status(self, key):
+        state = self.cache.state(key)
+        if state == "ready":
+            return "ready"
+        with self._lock:
+            job = self._jobs.get(key)
+            failure = self._failures.get(key)
+        return job or (failure[0] if failure is not None else state)
+
+    def _dispatch(self):
+        while True:
+            _, _, key, compute = self._queue.get()
+            with self._lock:
+                self._jobs[key] = "running"
+            failure = None
+            try:
+                self.cache.get_or_compute(key, compute)  # A page already computing it is waited for, not repeated
+            except Exception as e:
+                failure = f"failed ({type(e).__name__})"
+            with self._lock:
+                del self._jobs[key]
+                if failure is not None:
+                    self._failures[key] = (failure, time.monotonic())
+                    while len(self._failures) > MAX_FAILURES:
+                        self._failures.popitem(last=False)
+
+    def score(self, analyzer, texts):
+        # Score in chunks across the worker processes; index and order match texts
+        values = texts.tolist()
+        chunks = [values[i:i + CHUNK_TEXTS] for i in range(0, len(values), CHUNK_TEXTS)]
+        scored = Parallel(n_jobs=self.workers)(delayed(score_batch)(analyzer, chunk) for chunk in chunks)
+        return pd.Series([v for chunk in scored for v in chunk], index=texts.index)
+
+
+@st.cache_resource
+def get_prefetcher():
+    return PrefetchScheduler(get_shared_cache())
+
+
+def prefetch(results, analyses):
+    # Queue the enabled analyses for this session's column; returns {analysis: status}
+    scheduler = get_prefetcher()
+    statuses = {}
+    for name in sorted(analyses, key=lambda name: ANALYSES[name][0]):
+        priority, analyzer = ANALYSES[name]
+        if analyzer is None:
+            key, compute = results.job(name, lambda texts, broadcast: fit_topics(texts, DEFAULT_TOPICS, broadcast),
+                                       n_topics=DEFAULT_TOPICS)
+        else:
+            key, compute = results.column_job(name, lambda texts, analyzer=analyzer: scheduler.score(analyzer, texts))
+        scheduler.submit(key, priority, compute)
+        statuses[name] = scheduler.status(key)
+    return statuses
@@ -3,6 +3,7 @@ import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 import re
+from utils.ingest import read_excel_cached
 
 nltk.download("stopwords")
 nltk.download("punkt")
@@ -15,7 +16,7 @@ def clean_text(text):
     return text
 
 def preprocess_data(uploaded_file):
-    df = pd.read_csv(uploaded_file) if uploaded_file.name.endswith(".csv") else pd.read_excel(uploaded_file)
+    df = pd.read_csv(uploaded_file) if uploaded_file.name.endswith(".csv") else read_excel_cached(uploaded_file)
     df.dropna(inplace=True)  # Remove missing values
     df["cleaned_text"] = df[df.columns[0]].apply(clean_text)  # Apply text cleaning
     return df
@@ -0,0 +1,357 @@
+import os
+import uuid
+import shutil
+import weakref
+import streamlit as st
+import pandas as pd
+import numpy as np
+from pandas.api.types import union_categoricals
+from utils.shared_cache import get_shared_cache, dataset_fingerprint, cache_key
+from utils.spill import CHUNK_ROWS, SpilledColumn, can_spill, mapped_bytes, session_spill_dir
+from utils.sketches import score_sketch
+from utils.dedup import find_near_duplicates
+from utils.chart_data import aspect_sentiment_counts, category_counts, merge_counts
+
+# Shared, per-session store for derived analysis columns.
+# Only the computed columns live here (aligned to the uploaded data's index);
+# the source text is joined in lazily when a page displays or exports rows.
+# Once the resident columns exceed the session budget, the largest score/label
+# columns are spilled to memory-mapped files and read back in chunks; a spilled
+# column also replaces its in-memory copy in the shared cache, so RAM is released.
+# When rows are appended to the dataset, score columns are extended by scoring only
+# the new rows, and mergeable aggregates fold the new rows into the previous value.
+
+DEFAULT_SESSION_BUDGET_MB = 512
+
+# Aggregates that can be combined from partial results: func -> merge(previous, of_new_rows)
+MERGES = {
+    category_counts: merge_counts,
+    aspect_sentiment_counts: merge_counts,
+    score_sketch: lambda previous, added: previous + added,
+}
+
+
+def session_budget_bytes():
+    return int(float(os.environ.get("SENTIMENT_AI_SESSION_MB", DEFAULT_SESSION_BUDGET_MB)) * 2**20)
+
+
+class ResultStore:
+    def __init__(self, index, text_column, budget_bytes=None):
+        self.index = index
+        self.text_column = text_column
+        self.budget_bytes = session_budget_bytes() if budget_bytes is None else budget_bytes
+        self._columns = {}  # name -> Series (resident) or SpilledColumn (on disk)
+        self._spill_dir = None
+        self._tokens = {}  # name -> identity of the column's current values, used to key aggregates
+        self._recipes = {}  # name -> (analyzer, params) of columns filled by score(), to extend on append
+        self._lineage = {}  # name -> [(earlier token, rows it covered)] since the column was last computed
+        self._versions = []  # [(fingerprint, rows)] of the dataset before each append
+        self._fingerprint = None
+        self._column_fingerprints = {}  # Other columns of the dataset (e.g. customer IDs) -> content hash
+        self.dedup = None  # Optional DedupResult: analyse one representative per near-duplicate cluster
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def columns(self):
+        return list(self._columns)
+
+    def set(self, name, values):
+        self.drop(name)
+        self._store(name, self._prepare(name, values))
+        self._tokens[name] = uuid.uuid4().hex
+
+    def token(self, name):
+        return self._tokens[name]
+
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = dataset_fingerprint(st.session_state.data[self.text_column])
+        return self._fingerprint
+
+    def column_fingerprint(self, column):
+        # Hashed once per dataset, not on every rerun
+        if column not in self._column_fingerprints:
+            self._column_fingerprints[column] = dataset_fingerprint(st.session_state.data[column])
+        return self._column_fingerprints[column]
+
+    def set_dedup(self, dedup):
+        if self.dedup is dedup:
+            return
+        self.dedup = dedup
+        for name in list(self._columns):  # Results differ once rows are collapsed (or expanded again)
+            self.drop(name)
+
+    def near_duplicates(self, threshold):
+        # Clusters of the current dataset, shared with other sessions
+        key = cache_key(self.fingerprint(), self.text_column, "near_duplicates", {"threshold": threshold})
+        return get_shared_cache().get_or_compute(
+            key, lambda: find_near_duplicates(st.session_state.data[self.text_column], threshold))
+
+    def _params(self, params):
+        return dict(params, dedup=self.dedup.threshold) if self.dedup is not None else params
+
+    def representative_texts(self):
+        texts = st.session_state.data[self.text_column]
+        return texts if self.dedup is None else texts.iloc[self.dedup.representatives]
+
+    def representative_weights(self):
+        return np.ones(len(self.index), dtype=np.int64) if self.dedup is None else self.dedup.weights
+
+    def broadcast(self, values):
+        # Spread per-representative values back to every row of its cluster
+        return _broadcast(values, self.dedup, self.index)
+
+    def key(self, analysis, **params):
+        return cache_key(self.fingerprint(), self.text_column, analysis, self._params(params))
+
+    def cached(self, analysis, compute, **params):
+        # Look the analysis up in the server-wide cache before computing it for this session
+        return get_shared_cache().get_or_compute(self.key(analysis, **params), compute)
+
+    def job(self, analysis, func, **params):
+        # (cache key, compute) of an analysis, for running it off the script thread (utils/prefetch.py).
+        # The texts and dedup state are captured now; func(texts, broadcast) must not touch the session
+        texts, dedup, index = self.representative_texts(), self.dedup, self.index
+        return self.key(analysis, **params), lambda: func(texts, lambda values: _broadcast(values, dedup, index))
+
+    def column_job(self, name, func, **params):
+        # Same for a derived column: func maps the representative texts to one value each
+        # Aligned to the index at creation, which the key was made for (the data may grow meanwhile)
+        index = self.index
+        return self.job(name, lambda texts, broadcast: _align(name, broadcast(func(texts)), index), **params)
+
+    def compute(self, name, func, **params):
+        # Fill a derived column, sharing the (read-only) values with other sessions
+        if name not in self._columns:
+            values = self.cached(name, lambda: self._prepare(name, func()), **params)
+            self.drop(name)
+            self._tokens[name] = self.key(name, **params)  # Before storing: a spill swaps the shared copy
+            self._store(name, values)
+        return self.get(name)
+
+    def score(self, name, func, **params):
+        # Apply a per-text analyzer; with near-duplicates collapsed, once per cluster
+        values = self.compute(name, lambda: self.broadcast(self.representative_texts().apply(func)), **params)
+        self._recipes.setdefault(name, (func, params))
+        return values
+
+    def accumulate(self, analysis, func, merge, **params):
+        # cached() for additive summaries of the texts, func(texts, weights) -> value: after an
+        # append, only the new rows are summarised and merged into the earlier dataset's value
+        cache = get_shared_cache()
+
+        def compute():
+            if self.dedup is None:
+                for fingerprint, rows in reversed(self._versions):
+                    previous = cache.get(cache_key(fingerprint, self.text_column, analysis, self._params(params)))
+                    if previous is not None:
+                        added = self.representative_texts().iloc[rows:]
+                        return merge(previous, func(added, self.representative_weights()[rows:]))
+            return func(self.representative_texts(), self.representative_weights())
+
+        return self.cached(analysis, compute, **params)
+
+    def aggregate(self, name, func, **params):
+        # Memoized summary of a column (chart bins, counts); recomputed only when the column changes,
+        # or, for MERGES after an append, updated from the previous summary with the new rows only
+        cache = get_shared_cache()
+        key = lambda token: ("aggregate", token, func.__name__, tuple(sorted(params.items())))
+
+        def compute():
+            if func in MERGES:
+                for token, rows in reversed(self._lineage.get(name, [])):
+                    previous = cache.get(key(token))
+                    if previous is not None:
+                        return MERGES[func](previous, func(self.get(name, slice(rows, None)), **params))
+            return func(self.get(name), **params)
+
+        return cache.get_or_compute(key(self._tokens[name]), compute)
+
+    def sketch(self, name):
+        # Mergeable quantile sketch of a score column (shared: combine with +, never merge in place)
+        return self.aggregate(name, score_sketch)
+
+    def _prepare(self, name, values):
+        return _align(name, values, self.index)
+
+    def get(self, name, rows=None):
+        column = self._columns[name]
+        if isinstance(column, SpilledColumn):
+            return column.series(self.index, rows)  # Backed by the mapping; only touched pages are read
+        return column if rows is None else column.iloc[rows]
+
+    def iter_chunks(self, name, chunksize=CHUNK_ROWS):
+        for start in range(0, len(self.index), chunksize):
+            yield self.get(name, slice(start, start + chunksize))
+
+    def drop(self, name):
+        self._release(name)
+        self._tokens.pop(name, None)
+        self._recipes.pop(name, None)
+        self._lineage.pop(name, None)
+
+    def _release(self, name):
+        column = self._columns.pop(name, None)
+        if isinstance(column, SpilledColumn):
+            column.release()
+
+    def _store(self, name, series):
+        self._release(name)
+        self._columns[name] = series
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        # Spill the largest resident score/label columns until the session fits its budget
+        resident = {name: _resident_bytes(col) for name, col in self._columns.items()
+                    if isinstance(col, pd.Series) and can_spill(col) and not mapped_bytes(col)}
+        excess = self.memory_usage() - self.budget_bytes
+        for name in sorted(resident, key=resident.get, reverse=True):
+            if excess <= 0:
+                break
+            if self._spill_dir is None:
+                self._spill_dir = session_spill_dir()
+                weakref.finalize(self, shutil.rmtree, self._spill_dir, ignore_errors=True)
+            series = self._columns[name]
+            self._columns[name] = spilled = SpilledColumn(series, self._spill_dir)
+            if isinstance(self._tokens.get(name), tuple):  # Computed: the shared cache holds it too
+                # The mapping stays valid for readers after this session deletes the file
+                get_shared_cache().replace(self._tokens[name], series, spilled.series(self.index))
+            excess -= resident[name]
+
+    def extend(self, index):
+        # The dataset grew: index is the old index followed by the appended rows. Columns filled
+        # by score() are extended by scoring the new rows only; the rest are dropped (recomputed
+        # on use). Collapsed near-duplicates are re-clustered over all rows, so then everything goes.
+        rows = len(self.index)
+        threshold = self.dedup.threshold if self.dedup is not None else None
+        if threshold is not None or not index[:rows].equals(self.index):
+            for name in list(self._columns):
+                self.drop(name)
+            self._versions = []
+        else:
+            self._versions.append((self.fingerprint(), rows))
+        columns = {name: self.get(name) for name in self._columns}
+        self.index = index
+        self._fingerprint = None  # Of the grown dataset; keys of the extended columns
+        self._column_fingerprints = {}
+        if threshold is not None:  # The old clusters only cover the rows before the append
+            self.dedup = self.near_duplicates(threshold)
+        added = self.representative_texts().iloc[rows:]
+        for name, old in columns.items():
+            if name not in self._recipes:
+                self.drop(name)
+                continue
+            func, params = self._recipes[name]
+            lineage = self._lineage.get(name, []) + [(self._tokens[name], rows)]
+            # Shared under the grown dataset's key (another session may already have it)
+            values = self.cached(name, lambda: self._prepare(name, _concat(old, added.apply(func), index)), **params)
+            self._tokens[name] = self.key(name, **params)
+            self._store(name, values)
+            self._lineage[name] = lineage
+
+    def frame(self, columns, rows=None, text=True):
+        # Build a display/export frame on demand; nothing here is kept in session state
+        parts = [self.get(name, rows) for name in columns]
+        if text:
+            texts = st.session_state.data[self.text_column]
+            parts.insert(0, texts if rows is None else texts.iloc[rows])
+        return pd.concat(parts, axis=1)
+
+    def head(self, columns, n=5):
+        return self.frame(columns, rows=slice(0, n))
+
+    def to_csv(self, columns, chunksize=100_000):
+        # Encoded once per set of column values; reruns reuse the bytes instead of re-encoding
+        key = ("csv", self.fingerprint(), self.text_column, tuple(self._tokens[name] for name in columns), chunksize)
+        return get_shared_cache().get_or_compute(key, lambda: self._encode_csv(columns, chunksize))
+
+    def _encode_csv(self, columns, chunksize):
+        # Encode in slices so an export never materialises the full joined frame
+        chunks = []
+        for start in range(0, len(self.index), chunksize):
+            part = self.frame(columns, rows=slice(start, start + chunksize))
+            chunks.append(part.to_csv(index=False, header=start == 0))
+        if not chunks:
+            chunks.append(pd.DataFrame(columns=[self.text_column] + list(columns)).to_csv(index=False))
+        return "".join(chunks).encode("utf-8")
+
+    def memory_usage(self):
+        return int(sum(_resident_bytes(col) for col in self._columns.values() if isinstance(col, pd.Series)))
+
+    def spilled_bytes(self):
+        # Spilled by this session, or shared already mapped by another session's spill
+        return int(sum(col.nbytes if isinstance(col, SpilledColumn) else mapped_bytes(col)
+                       for col in self._columns.values()))
+
+
+def _concat(old, added, index):
+    # Labels stay categorical: codes are appended instead of expanding both parts to strings
+    values = None
+    if isinstance(old.dtype, pd.CategoricalDtype):
+        try:
+            values = union_categoricals([old.array, added.astype("category").array], ignore_order=True)
+        except TypeError:
+            pass  # e.g. dicts, or categories of another type: fall back to a plain concat
+    if values is None:
+        values = pd.concat([old, added]).array
+    return pd.Series(values, index=index, name=old.name)
+
+
+def _resident_bytes(series):
+    return int(series.memory_usage(index=False, deep=True)) - mapped_bytes(series)
+
+
+def _broadcast(values, dedup, index):
+    if dedup is None:
+        return values
+    return pd.Series(values.iloc[dedup.cluster].array, index=index, name=values.name)
+
+
+def _align(name, values, index):
+    series = values if isinstance(values, pd.Series) else pd.Series(values, index=index)
+    if not series.index.equals(index):
+        series = series.reindex(index)  # e.g. results computed on a filtered subset
+    if series.name != name:
+        series = series.rename(name)
+    return _compact(series)
+
+
+def _compact(series):
+    # Labels become categoricals, scores become float32
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if series.dtype == np.float32:
+        return series
+    if pd.api.types.is_float_dtype(series.dtype):
+        return series.astype(np.float32)
+    if pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype("category")
+    if (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)) and \
+            series.map(lambda v: v is None or isinstance(v, str) or v != v).all():
+        return series.astype("category")
+    return series  # e.g. per-row dicts of aspect sentiments
+
+
+def get_results():
+    data = st.session_state.data
+    column = st.session_state.selected_column
+    store = st.session_state.get("results")
+    if store is None or store.text_column != column or not store.index.equals(data.index):
+        store = ResultStore(data.index, column)
+        st.session_state.results = store
+    return store
+
+
+def append_data(rows):
+    # Add rows to the session's dataset, extending the results instead of recomputing them
+    store = get_results()
+    store.fingerprint()  # Of the data before the append
+    data = pd.concat([st.session_state.data, rows], ignore_index=True)
+    st.session_state.data = data
+    store.extend(data.index)
+    return data
+
+
+def reset_results():
+    st.session_state.results = None
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from utils.spill import CHUNK_ROWS
+
+# Per-customer features from per-review scores, for segmenting customers instead of reviews.
+# Customer ids are factorized once into integer codes; the score columns are then read
+# chunk by chunk and every statistic is a np.bincount (or ufunc.at) over those codes, so
+# memory grows with the number of customers, not reviews. The trend is the least-squares
+# slope of polarity over time (or over the customer's review order), built from the
+# same running sums.
+
+SEGMENT_FEATURES = ["Mean Polarity", "Min Polarity", "Mean Intensity", "Trend", "Reviews"]
+
+
+class CustomerRollup:
+    def __init__(self, n_customers, emotions):
+        self.emotions = list(emotions)
+        self.reviews = np.zeros(n_customers, dtype=np.int64)
+        self.scored = np.zeros(n_customers, dtype=np.int64)  # Reviews with a polarity
+        self.polarity_sum = np.zeros(n_customers)
+        self.polarity_min = np.full(n_customers, np.inf)
+        self.intensity_sum = np.zeros(n_customers)
+        self.intensity_count = np.zeros(n_customers, dtype=np.int64)
+        self.emotion_counts = np.zeros((n_customers, max(1, len(self.emotions))), dtype=np.int32)
+        self.trend_sums = np.zeros((5, n_customers))  # n, Σx, Σy, Σxy, Σx² of (time or review order, polarity)
+
+    def _sum(self, codes, weights=None):
+        return np.bincount(codes, weights=weights, minlength=len(self.reviews))
+
+    def update(self, codes, polarity, intensity=None, emotion_codes=None, x=None):
+        # One chunk of reviews; codes < 0 (missing customer id) are skipped
+        keep = codes >= 0
+        codes, polarity = codes[keep], polarity[keep]
+        if x is None:  # Position of each review within its customer's reviews so far
+            x = self.reviews[codes] + pd.Series(codes).groupby(codes).cumcount().to_numpy()
+        else:
+            x = x[keep]
+        self.reviews += self._sum(codes)
+
+        scored = np.isfinite(polarity)
+        self.scored += self._sum(codes[scored])
+        self.polarity_sum += self._sum(codes[scored], polarity[scored])
+        np.minimum.at(self.polarity_min, codes[scored], polarity[scored])
+
+        if intensity is not None:
+            intensity = intensity[keep]
+            valid = np.isfinite(intensity)
+            self.intensity_sum += self._sum(codes[valid], intensity[valid])
+            self.intensity_count += self._sum(codes[valid])
+
+        if emotion_codes is not None and self.emotions:
+            emotion_codes = emotion_codes[keep]
+            valid = emotion_codes >= 0
+            np.add.at(self.emotion_counts, (codes[valid], emotion_codes[valid]), 1)
+
+        valid = scored & np.isfinite(x)
+        c, x, y = codes[valid], x[valid].astype(np.float64), polarity[valid]
+        for i, weights in enumerate((None, x, y, x * y, x * x)):
+            self.trend_sums[i] += self._sum(c, weights)
+        return self
+
+    def frame(self, customers, trend_scale=1.0):
+        n, sx, sy, sxy, sxx = self.trend_sums
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = n * sxx - sx * sx
+            trend = np.where(denominator > 0, (n * sxy - sx * sy) / denominator, np.nan) * trend_scale
+            mean_polarity = self.polarity_sum / self.scored
+            mean_intensity = self.intensity_sum / self.intensity_count
+        frame = pd.DataFrame({
+            "Customer": customers,
+            "Reviews": self.reviews,
+            "Mean Polarity": mean_polarity.astype(np.float32),
+            "Min Polarity": np.where(self.scored > 0, self.polarity_min, np.nan).astype(np.float32),
+            "Mean Intensity": mean_intensity.astype(np.float32),
+            "Trend": trend.astype(np.float32),
+        })
+        if self.emotions:
+            dominant = np.where(self.emotion_counts.any(axis=1), self.emotion_counts.argmax(axis=1), -1)
+            frame["Dominant Emotion"] = pd.Categorical.from_codes(dominant, categories=self.emotions)
+        return frame
+
+
+def _label_codes(chunk, categories):
+    # Codes of a label chunk against a fixed category list (-1 for missing/unknown)
+    if isinstance(chunk.dtype, pd.CategoricalDtype) and list(chunk.cat.categories) == list(categories):
+        return chunk.cat.codes.to_numpy()
+    return pd.Categorical(chunk, categories=categories).codes
+
+
+def customer_rollups(results, ids, times=None, chunksize=CHUNK_ROWS):
+    # ids (and times) are aligned to results.index; results must hold "Sentiment Score",
+    # and may hold "Sentiment Intensity" and "Emotion"
+    codes, customers = pd.factorize(ids, use_na_sentinel=True)
+    emotions = []
+    if "Emotion" in results:
+        labels = results.get("Emotion")
+        emotions = list(labels.cat.categories) if isinstance(labels.dtype, pd.CategoricalDtype) else \
+            sorted(labels.dropna().unique().tolist())
+    rollup = CustomerRollup(len(customers), emotions)
+
+    for start in range(0, len(codes), chunksize):
+        rows = slice(start, start + chunksize)
+        x = None
+        if times is not None:
+            stamps = pd.to_datetime(times.iloc[rows], errors="coerce", utc=True)
+            x = (stamps - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(days=1)  # Days; NaT -> NaN
+            x = x.to_numpy(dtype=np.float64, na_value=np.nan)
+        rollup.update(
+            codes[rows],
+            results.get("Sentiment Score", rows).to_numpy(dtype=np.float64),
+            results.get("Sentiment Intensity", rows).to_numpy(dtype=np.float64) if "Sentiment Intensity" in results else None,
+            _label_codes(results.get("Emotion", rows), emotions) if emotions else None,
+            x,
+        )
+    # Trend per 30 days with timestamps, otherwise per review
+    return rollup.frame(customers, trend_scale=30.0 if times is not None else 1.0)
+
+
+def segment_customers(rollups, n_clusters=3):
+    # k-means on the standardised rollup features; segment 0 has the lowest mean polarity
+    if rollups.empty:
+        return pd.Series(pd.Categorical([], categories=range(n_clusters)), index=rollups.index)
+    features = rollups[SEGMENT_FEATURES].astype(np.float64)
+    features["Reviews"] = np.log1p(features["Reviews"])  # Heavy reviewers should not dominate
+    features = features.fillna(0.0)  # No trend with a single review, etc.
+    X = StandardScaler().fit_transform(features)
+    n_clusters = min(n_clusters, len(rollups))
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3, batch_size=4096)
+    labels = kmeans.fit_predict(X)
+    order = np.argsort(np.argsort(kmeans.cluster_centers_[:, 0]))  # Rank of each centre by mean polarity
+    return pd.Series(pd.Categorical(order[labels], categories=range(n_clusters)), index=rollups.index)
+
+
+def segment_profiles(rollups, segments):
+    # One row per segment: customers, reviews and mean features (dominant emotion: most common)
+    frame = rollups.assign(Segment=segments.to_numpy())
+    profiles = frame.groupby("Segment", observed=True).agg(
+        Customers=("Customer", "size"),
+        Reviews=("Reviews", "sum"),
+        **{f"Avg {name}": (name, "mean") for name in ["Mean Polarity", "Min Polarity", "Mean Intensity", "Trend"]},
+    )
+    if "Dominant Emotion" in frame:
+        profiles["Top Emotion"] = frame.groupby("Segment", observed=True)["Dominant Emotion"].agg(
+            lambda values: values.mode().iloc[0] if values.notna().any() else None)
+    return profiles.reset_index()
@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from utils.analysis import ANALYZERS, score_batch, warm_analyzers
+
+# Standalone HTTP scoring service for live tickets, using the dashboard's analyzers.
+#
+#   python -m utils.scoring_service --port 8600 --workers 4 --max-wait-ms 5
+#
+#   POST /score    {"analyzer": "vader", "texts": ["...", "..."]}  (or "text": "...")
+#   GET  /metrics  request/batch counts and p50/p99 latency per analyzer
+#   GET  /health
+#
+# Concurrent requests for the same analyzer are collected into micro-batches
+# (up to --max-batch texts, waiting at most --max-wait-ms for more to arrive)
+# and each batch is scored in a worker pool.
+
+MAX_BODY_BYTES = 8 * 2**20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class LatencyTracker:
+    def __init__(self, window=10_000):
+        self.samples = deque(maxlen=window)  # Most recent request latencies in seconds
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.batched_texts = 0
+
+    def record_request(self, seconds, n_texts):
+        self.samples.append(seconds)
+        self.requests += 1
+        self.texts += n_texts
+
+    def record_batch(self, n_texts):
+        self.batches += 1
+        self.batched_texts += n_texts
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def summary(self):
+        p50, p99 = self.percentile(50), self.percentile(99)
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_texts / self.batches if self.batches else 0.0,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p99_ms": p99 * 1000 if p99 is not None else None,
+        }
+
+
+class MicroBatcher:
+    def __init__(self, analyzer, executor, max_batch, max_wait_ms, max_in_flight, tracker):
+        self.analyzer = analyzer
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.tracker = tracker
+        self.queue = asyncio.Queue()
+        self.in_flight = asyncio.Semaphore(max_in_flight)  # Keep at most one batch per worker running
+        self._tasks = set()  # Running dispatches; the loop only holds tasks weakly
+
+    async def submit(self, texts):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                size += len(item[0])
+            await self.in_flight.acquire()
+            task = asyncio.create_task(self._dispatch(items, size))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, items, size):
+        texts = [text for item_texts, _ in items for text in item_texts]
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(self.executor, score_batch, self.analyzer, texts)
+        except Exception as exc:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            self.in_flight.release()
+        self.tracker.record_batch(size)
+        start = 0
+        for item_texts, future in items:  # Hand each request back its own slice of the batch
+            if not future.done():
+                future.set_result(scores[start:start + len(item_texts)])
+            start += len(item_texts)
+
+
+class ScoringService:
+    def __init__(self, workers, max_batch, max_wait_ms, use_threads=False):
+        pool = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+        self.executor = pool(max_workers=workers, initializer=warm_analyzers)  # Lexicons ready before the first batch
+        self.trackers = {name: LatencyTracker() for name in ANALYZERS}
+        self.batchers = {
+            name: MicroBatcher(name, self.executor, max_batch, max_wait_ms, workers, self.trackers[name])
+            for name in ANALYZERS
+        }
+
+    async def start(self, host, port):
+        self._tasks = [asyncio.create_task(batcher.run()) for batcher in self.batchers.values()]
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def metrics(self):
+        return {name: tracker.summary() for name, tracker in self.trackers.items()}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:  # HTTP/1.1 keep-alive: serve requests until the client hangs up
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as exc:  # Malformed request line/headers or oversized body
+            status = 413 if "too large" in str(exc) else 400
+            await write_response(writer, status, {"error": str(exc)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path != "/score":
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST for /score"}
+
+        start = time.perf_counter()
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError as exc:
+            return 400, {"error": f"Invalid JSON: {exc}"}
+        if not isinstance(request, dict):
+            return 400, {"error": "The request body must be a JSON object"}
+        analyzer = request.get("analyzer", "vader")
+        if not isinstance(analyzer, str) or analyzer not in self.batchers:
+            return 400, {"error": f"Unknown analyzer {analyzer!r}", "analyzers": list(ANALYZERS)}
+        texts = request["texts"] if "texts" in request else [request.get("text")]
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return 400, {"error": "'texts' must be a list of strings (or 'text' a string)"}
+
+        try:
+            scores = await self.batchers[analyzer].submit(texts)
+        except Exception as exc:
+            return 500, {"error": str(exc)}
+        self.trackers[analyzer].record_request(time.perf_counter() - start, len(texts))
+        return 200, {"analyzer": analyzer, "results": scores}
+
+
+async def read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("Malformed request line")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+
+async def write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(args):
+    service = ScoringService(args.workers, args.max_batch, args.max_wait_ms, args.threads)
+    server = await service.start(args.host, args.port)
+    print(f"Scoring service listening on http://{args.host}:{args.port} "
+          f"({args.workers} {'threads' if args.threads else 'processes'}, "
+          f"batch <= {args.max_batch}, wait <= {args.max_wait_ms} ms)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-batch", type=int, default=64, help="Maximum texts per micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Maximum time to wait for a batch to fill")
+    parser.add_argument("--threads", action="store_true", help="Use a thread pool instead of processes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+
+from utils.shared_cache import get_shared_cache
+
+# Sentiment segmentation that reads the score column in chunks.
+# Scores are one-dimensional, so k-means runs on the column's quantile sketch (bin
+# centres weighted by counts) instead of on every row; each segment is then an
+# interval between two boundaries and rows are labelled chunk by chunk.
+
+
+def fit_segments(sketch, n_clusters=3):
+    edges = sketch.edges
+    occupied = sketch.counts > 0
+    centers = ((edges[:-1] + edges[1:]) / 2)[occupied]
+    if len(centers) == 0:
+        return np.array([])
+    kmeans = KMeans(n_clusters=min(n_clusters, len(centers)), random_state=42, n_init=10)
+    kmeans.fit(centers.reshape(-1, 1), sample_weight=sketch.counts[occupied])
+
+    # Segment ids follow the score order: 0 is the most negative segment
+    means = np.sort(kmeans.cluster_centers_.ravel())
+    return (means[:-1] + means[1:]) / 2
+
+
+def assign_segments(chunk, boundaries):
+    values = np.asarray(chunk, dtype=np.float64)
+    codes = np.searchsorted(boundaries, values).astype(np.int8)
+    codes[~np.isfinite(values)] = -1  # Missing score -> missing segment
+    return codes
+
+
+def segment_boundaries(results, column, n_clusters=3):
+    key = ("segments", results.token(column), n_clusters)
+    return get_shared_cache().get_or_compute(key, lambda: fit_segments(results.sketch(column), n_clusters))
+
+
+def segment_scores(results, column, n_clusters=3):
+    boundaries = segment_boundaries(results, column, n_clusters)
+    codes = np.concatenate([assign_segments(chunk, boundaries) for chunk in results.iter_chunks(column)] or
+                           [np.array([], dtype=np.int8)])
+    segments = pd.Categorical.from_codes(codes, categories=range(len(boundaries) + 1))
+    return pd.Series(segments, index=results.index)
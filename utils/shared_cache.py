@@ -0,0 +1,156 @@
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+
+from utils.spill import mapped_bytes
+
+# Process-wide cache of analysis results shared by every session on the server.
+# Entries are keyed by (dataset fingerprint, text column, analysis, parameters),
+# so identical uploads from different analysts are only computed once.
+# Cached values are shared, never copied: callers must treat them as read-only.
+# A key being computed is tracked as in flight: other callers wait for that
+# computation (e.g. a background prefetch) instead of starting their own.
+
+DEFAULT_BUDGET_MB = 1024
+
+
+class SharedResultCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size in bytes), oldest first
+        self._in_flight = {}  # key -> Future of the running computation
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.attached = 0
+
+    def get(self, key):
+        # Cached value or None, for internal probes (earlier versions, pre-rendering); hits and
+        # misses count get_or_compute lookups only, the analyses pages actually ask for
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)  # Mark as most recently used
+            return entry[0]
+
+    def put(self, key, value):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= self._entries.pop(key)[1]
+            if size > self.budget_bytes:
+                return value  # Larger than the whole budget: hand it back uncached
+            self._entries[key] = (value, size)
+            self.size_bytes += size
+            while self.size_bytes > self.budget_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def replace(self, key, value, replacement):
+        # Swap a cached value for an equivalent one (e.g. its memory-mapped copy), if still cached
+        size = _sizeof(replacement)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not value:
+                return False
+            self._entries[key] = (replacement, size)
+            self.size_bytes += size - entry[1]
+            return True
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.attached += 1
+        if not owner:
+            return future.result()  # Already being computed: wait for that result (or its error)
+        try:
+            value = self.put(key, compute())
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return value
+
+    def state(self, key):
+        # "ready", "running" or None, without counting as a lookup
+        with self._lock:
+            if key in self._entries:
+                return "ready"
+            return "running" if key in self._in_flight else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_mb": self.size_bytes / 2**20,
+                "budget_mb": self.budget_bytes / 2**20,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "attached": self.attached,
+                "in_flight": len(self._in_flight),
+            }
+
+
+def _sizeof(value):
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True)) - mapped_bytes(value)  # Mapped values are on disk
+    if isinstance(value, pd.DataFrame):
+        return int(np.sum(value.memory_usage(index=True, deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_sizeof(item) for item in value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+@st.cache_resource
+def get_shared_cache():
+    budget_mb = float(os.environ.get("SENTIMENT_AI_CACHE_MB", DEFAULT_BUDGET_MB))
+    return SharedResultCache(int(budget_mb * 2**20))
+
+
+def dataset_fingerprint(texts):
+    # Content hash of the text column (values and index), independent of the file name
+    hashed = pd.util.hash_pandas_object(texts, index=True).to_numpy()
+    return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+
+def cache_key(fingerprint, column, analysis, params=None):
+    return (fingerprint, column, analysis, tuple(sorted((params or {}).items())))
@@ -0,0 +1,136 @@
+import re
+import glob
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from utils.shared_cache import get_shared_cache
+
+# Datasets on the server's disk (a file, a folder of daily shards or a glob), opened
+# lazily as a pyarrow dataset. Only the selected columns are read, and a date range on
+# a timestamp column is pushed down to the scan (row groups / files outside the range
+# are skipped for Parquet), so nothing passes through the browser upload limit and
+# the full export is never copied into memory.
+
+FORMATS = {".parquet": "parquet", ".csv": "csv"}
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def dataset_files(path):
+    path = str(Path(str(path)).expanduser())
+    if Path(path).is_dir():
+        files = [str(f) for f in Path(path).rglob("*") if f.suffix in FORMATS]
+    elif glob.has_magic(path):
+        files = glob.glob(path, recursive=True)
+    else:
+        files = [path]
+    return sorted(f for f in files if Path(f).is_file() and Path(f).suffix in FORMATS)
+
+
+def signature(files):
+    # Changes when a shard is added, removed or rewritten
+    return tuple((f, Path(f).stat().st_size, Path(f).stat().st_mtime_ns) for f in files)
+
+
+def open_dataset(path):
+    files = dataset_files(path)
+    if not files:
+        raise FileNotFoundError(f"No .parquet or .csv files found at {path}")
+    formats = {FORMATS[Path(f).suffix] for f in files}
+    if len(formats) > 1:
+        raise ValueError(f"{path} mixes Parquet and CSV files; point at one format")
+    base = str(Path(str(path)).expanduser()) if Path(str(path)).expanduser().is_dir() else None
+    # Folder layouts like date=2024-05-01/part-0.parquet become columns too
+    return ds.dataset(files, format=formats.pop(), partitioning="hive", partition_base_dir=base)
+
+
+def dataset_columns(path):
+    schema = open_dataset(path).schema
+    return {field.name: field.type for field in schema}
+
+
+def is_temporal(data_type):
+    return pa.types.is_timestamp(data_type) or pa.types.is_date(data_type)
+
+
+def is_text(data_type):
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def _scalar(value, data_type):
+    if pa.types.is_date(data_type):
+        return pa.scalar(value.date() if isinstance(value, datetime) else value, type=data_type)
+    value = pd.Timestamp(value)
+    if data_type.tz is not None and value.tzinfo is None:
+        value = value.tz_localize(data_type.tz)
+    return pa.scalar(value.to_pydatetime(), type=data_type)
+
+
+def _bounds(start, end):
+    # Inclusive calendar dates -> [start 00:00, day after end 00:00)
+    lower = datetime.combine(start, time.min) if start is not None else None
+    upper = datetime.combine(end + timedelta(days=1), time.min) if end is not None else None
+    return lower, upper
+
+
+def date_filter(column, data_type, start=None, end=None):
+    lower, upper = _bounds(start, end)
+    expression = None
+    for bound, compare in ((lower, pc.greater_equal), (upper, pc.less)):
+        if bound is not None:
+            # ISO-8601 text (e.g. hive folders date=2024-05-01) sorts like the dates it holds
+            value = bound.date().isoformat() if is_text(data_type) else _scalar(bound, data_type)
+            term = compare(pc.field(column), value)
+            expression = term if expression is None else expression & term
+    return expression
+
+
+def time_range(path, column):
+    # Earliest and latest value of the timestamp column (reads that one column, once per file set)
+    def scan():
+        dataset = open_dataset(path)
+        lowest = highest = None
+        for batch in dataset.to_batches(columns=[column]):
+            bounds = pc.min_max(batch.column(0))
+            low, high = bounds["min"].as_py(), bounds["max"].as_py()
+            if low is not None:
+                lowest = low if lowest is None else min(lowest, low)
+                highest = high if highest is None else max(highest, high)
+        return lowest, highest
+
+    return get_shared_cache().get_or_compute(("time_range", signature(dataset_files(path)), column), scan)
+
+
+def is_iso_text(path, column, data_type):
+    if not is_text(data_type):
+        return False
+    lowest, highest = time_range(path, column)
+    return lowest is not None and all(ISO_DATE.match(value) for value in (lowest, highest))
+
+
+def load_dataset(path, text_column, time_column=None, customer_column=None, start=None, end=None):
+    dataset = open_dataset(path)
+    columns = list(dict.fromkeys(c for c in (text_column, time_column, customer_column) if c))
+    filtered = time_column is not None and (start is not None or end is not None)
+    data_type = dataset.schema.field(time_column).type if time_column else None
+
+    if filtered and (is_temporal(data_type) or is_iso_text(path, time_column, data_type)):
+        table = dataset.to_table(columns=columns, filter=date_filter(time_column, data_type, start, end))
+        return table.to_pandas()
+
+    df = dataset.to_table(columns=columns).to_pandas()
+    if filtered:
+        # Text timestamps cannot be compared inside the scan; parse and filter after loading
+        lower, upper = _bounds(start, end)
+        times = pd.to_datetime(df[time_column], errors="coerce")
+        keep = pd.Series(True, index=df.index)
+        if lower is not None:
+            keep &= times >= lower
+        if upper is not None:
+            keep &= times < upper
+        df = df[keep].reset_index(drop=True)
+    return df
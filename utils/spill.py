@@ -0,0 +1,64 @@
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+# Result columns moved out of RAM into memory-mapped .npy files on local disk.
+# Scores are stored as their float32 values, labels as categorical codes (the
+# categories themselves stay in memory). Readers get Series backed by the mapping,
+# so the OS pages values in as they are touched instead of the session holding them.
+
+SPILL_DIR = Path(os.environ.get("SENTIMENT_AI_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache")) / "spill"
+CHUNK_ROWS = 200_000
+
+
+def can_spill(series):
+    return isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(series.dtype)
+
+
+def mapped_bytes(series):
+    # Bytes of the series' values held by a memory mapping (0 for values in RAM)
+    values = series.array.codes if isinstance(series.dtype, pd.CategoricalDtype) else series.array
+    values = base = np.asarray(values)
+    while isinstance(base, np.ndarray):
+        if isinstance(base, np.memmap):
+            return values.nbytes
+        base = base.base
+    return 0
+
+
+class SpilledColumn:
+    def __init__(self, series, directory):
+        self.name = series.name
+        self.path = Path(directory) / f"{uuid.uuid4().hex}.npy"
+        self.dtype = series.dtype if isinstance(series.dtype, pd.CategoricalDtype) else None
+        values = series.cat.codes.to_numpy() if self.dtype is not None else series.to_numpy()
+        array = open_memmap(self.path, mode="w+", dtype=values.dtype, shape=values.shape)
+        for start in range(0, len(values), CHUNK_ROWS):
+            array[start:start + CHUNK_ROWS] = values[start:start + CHUNK_ROWS]
+        array.flush()
+        del array
+        self.nbytes = values.nbytes
+
+    def array(self):
+        return np.load(self.path, mmap_mode="r")  # Read-only: the values may be shared
+
+    def series(self, index, rows=None):
+        values = self.array()
+        if rows is not None:
+            values, index = values[rows], index[rows]
+        if self.dtype is not None:
+            values = pd.Categorical.from_codes(values, dtype=self.dtype)
+        return pd.Series(values, index=index, name=self.name, copy=False)
+
+    def release(self):
+        self.path.unlink(missing_ok=True)
+
+
+def session_spill_dir():
+    directory = SPILL_DIR / uuid.uuid4().hex
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
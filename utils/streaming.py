@@ -0,0 +1,141 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.analysis import get_sentiment, get_sentiment_intensity, get_emotions
+
+# Tail-follow of growing CSV files with incrementally updated time-bucket aggregates.
+# Only bytes appended since the previous poll are read and scored. A poll stops at the
+# last complete record: quoted fields may contain newlines, so rows are never split.
+# A file that is truncated or replaced (e.g. rotated) is read again from its header.
+
+IDENTITY_BYTES = 4096  # Leading bytes (header and first records) compared to detect a replaced file
+
+
+class FileTailer:
+    def __init__(self, path, pattern="*.csv"):
+        self.path = Path(path).expanduser()
+        self.pattern = pattern
+        self.offsets = {}  # file -> byte offset just past the last complete row read
+        self.headers = {}  # file -> raw header line, re-used to parse appended chunks
+        self.identities = {}  # file -> (device, inode, leading bytes already read) at the saved offset
+
+    def files(self):
+        if self.path.is_dir():
+            return sorted(self.path.glob(self.pattern))
+        return [self.path] if self.path.exists() else []
+
+    def columns(self):
+        for file in self.files():
+            header = self._header(file)
+            if header:
+                return pd.read_csv(io.BytesIO(header)).columns.tolist()
+        return []
+
+    def _header(self, file):
+        if file not in self.headers:
+            with open(file, "rb") as fh:
+                line = fh.readline()
+            if not line.endswith(b"\n"):
+                return None  # Header still being written
+            self.headers[file] = line
+        return self.headers[file]
+
+    def poll(self):
+        frames = []
+        for file in self.files():
+            header = self._header(file)
+            if header is None:
+                continue
+            stat = file.stat()
+            offset = self.offsets.get(file, len(header))
+            with open(file, "rb") as fh:
+                identity = self.identities.get(file)
+                if identity is not None and (stat.st_size < offset or identity != _identity(fh, stat, len(identity[2]))):
+                    # Truncated or replaced: start over from the new file's header
+                    self.headers.pop(file, None)
+                    self.offsets.pop(file, None)
+                    self.identities.pop(file, None)
+                    header = self._header(file)
+                    if header is None:
+                        continue
+                    offset = len(header)
+                fh.seek(offset)
+                chunk = fh.read(stat.st_size - offset)
+                end = _record_end(chunk)
+                self.offsets[file] = offset + end
+                self.identities[file] = _identity(fh, stat, min(offset + end, IDENTITY_BYTES))
+            if end:  # Otherwise nothing new, or only a partial row so far
+                frames.append(pd.read_csv(io.BytesIO(header + chunk[:end])))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _identity(fh, stat, length):
+    fh.seek(0)
+    return stat.st_dev, stat.st_ino, fh.read(length)
+
+
+def _record_end(chunk):
+    # Length of chunk up to its last newline outside a quoted field (0 if none). Offsets always
+    # sit on a record boundary, so quotes are balanced there; an escaped "" toggles twice.
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    quoted = np.cumsum(data == ord('"')) % 2 == 1
+    ends = np.flatnonzero((data == ord("\n")) & ~quoted)
+    return int(ends[-1]) + 1 if len(ends) else 0
+
+
+class TrendAggregator:
+    def __init__(self, freq="1h", window=48, emotions=True):
+        self.freq = freq
+        self.window = window  # Number of most recent time buckets to keep
+        self.emotions = emotions
+        self.sentiment_counts = pd.DataFrame()
+        self.intensity = pd.DataFrame(columns=["sum", "count"], dtype=float)
+        self.emotion_counts = pd.DataFrame()
+        self.rows = 0
+        self.skipped = 0
+
+    def update(self, frame, text_column, time_column):
+        timestamps = pd.to_datetime(frame[time_column], errors="coerce")
+        valid = timestamps.notna()
+        self.skipped += int((~valid).sum())
+        if not valid.any():
+            return 0
+        texts = frame.loc[valid, text_column].astype(str)
+        buckets = timestamps[valid].dt.floor(self.freq).rename("Time")
+
+        # Score only the new rows, then fold their per-bucket counts into the running totals
+        sentiments = texts.apply(get_sentiment).rename("Sentiment")
+        intensities = texts.apply(get_sentiment_intensity).astype(float)
+        self.sentiment_counts = self.sentiment_counts.add(pd.crosstab(buckets, sentiments), fill_value=0).fillna(0)
+        grouped = intensities.groupby(buckets).agg(["sum", "count"])
+        self.intensity = self.intensity.add(grouped, fill_value=0)
+        if self.emotions:
+            emotions = texts.apply(get_emotions).rename("Emotion")
+            self.emotion_counts = self.emotion_counts.add(pd.crosstab(buckets, emotions), fill_value=0).fillna(0)
+
+        self.rows += len(texts)
+        self._trim()
+        return len(texts)
+
+    def _trim(self):
+        if len(self.intensity) <= self.window:
+            return
+        cutoff = self.intensity.index.sort_values()[-self.window]
+        self.sentiment_counts = self.sentiment_counts[self.sentiment_counts.index >= cutoff]
+        self.intensity = self.intensity[self.intensity.index >= cutoff]
+        if self.emotions:
+            self.emotion_counts = self.emotion_counts[self.emotion_counts.index >= cutoff]
+
+    def sentiment_share(self):
+        counts = self.sentiment_counts.sort_index()
+        return counts.div(counts.sum(axis=1), axis=0)
+
+    def mean_intensity(self):
+        intensity = self.intensity.sort_index()
+        return intensity["sum"] / intensity["count"]
+
+    def emotions_by_bucket(self):
+        return self.emotion_counts.sort_index()
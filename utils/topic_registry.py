@@ -0,0 +1,113 @@
+import os
+import re
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.decomposition import LatentDirichletAllocation
+
+# Local registry of fitted topic models (CountVectorizer + LatentDirichletAllocation).
+# Each save creates models/topics/<name>/v<N>/ with the pickled pair and a meta.json,
+# so later uploads can be assigned to the same, stable topic ids without refitting.
+
+REGISTRY_DIR = Path(os.environ.get("SENTIMENT_AI_MODEL_DIR", Path(__file__).resolve().parent.parent / "models")) / "topics"
+MODEL_FILE = "model.joblib"
+META_FILE = "meta.json"
+
+
+def _slug(name):
+    return re.sub(r"[^\w-]+", "_", name.strip()).strip("_") or "topics"
+
+
+def extract_topic_keywords(vectorizer, lda, n_words=10):
+    words = vectorizer.get_feature_names_out()
+    return {i: [words[idx] for idx in topic.argsort()[-n_words:]] for i, topic in enumerate(lda.components_)}
+
+
+def topic_word_frequencies(vectorizer, lda, n_words=50):
+    # Topic-word weights for word clouds (larger weight -> larger word)
+    words = vectorizer.get_feature_names_out()
+    return {
+        i: {words[idx]: float(topic[idx]) for idx in topic.argsort()[-n_words:]}
+        for i, topic in enumerate(lda.components_)
+    }
+
+
+def save_topic_model(name, vectorizer, lda, metadata=None):
+    model_dir = REGISTRY_DIR / _slug(name)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    versions = [int(p.name[1:]) for p in model_dir.glob("v*") if p.name[1:].isdigit()]
+    version = max(versions, default=0) + 1
+    while True:  # mkdir claims the version atomically; a concurrent save of the same name takes the next
+        version_dir = model_dir / f"v{version}"
+        try:
+            version_dir.mkdir()
+            break
+        except FileExistsError:
+            version += 1
+
+    joblib.dump({"vectorizer": vectorizer, "lda": lda}, version_dir / MODEL_FILE)
+    meta = {
+        "name": _slug(name),
+        "version": version,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "n_topics": int(lda.n_components),
+        "n_features": len(vectorizer.get_feature_names_out()),
+        "topic_keywords": {str(k): v for k, v in extract_topic_keywords(vectorizer, lda).items()},
+        "dataset": metadata or {},
+    }
+    # Written last and renamed into place: the registry lists a version only once it is complete
+    tmp = version_dir / f"{META_FILE}.tmp"
+    tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, version_dir / META_FILE)
+    return meta
+
+
+def list_topic_models():
+    models = []
+    for meta_path in sorted(REGISTRY_DIR.glob(f"*/v*/{META_FILE}")):
+        models.append(json.loads(meta_path.read_text()))
+    return sorted(models, key=lambda m: (m["name"], -m["version"]))
+
+
+def load_topic_model(name, version):
+    version_dir = REGISTRY_DIR / _slug(name) / f"v{version}"
+    if not (version_dir / MODEL_FILE).exists():
+        raise FileNotFoundError(f"Topic model {name} v{version} not found in {REGISTRY_DIR}")
+    model = joblib.load(version_dir / MODEL_FILE)
+    meta = json.loads((version_dir / META_FILE).read_text())
+    return model["vectorizer"], model["lda"], meta
+
+
+def fit_topics(texts, n_topics, broadcast=lambda topics: topics):
+    # Fit a new model; rows with missing text stay unassigned
+    present = texts.dropna()
+    # Convert text into numerical format
+    vectorizer = CountVectorizer(stop_words="english", max_features=1000)
+    X = vectorizer.fit_transform(present)
+
+    # Apply LDA
+    lda = LatentDirichletAllocation(n_components=n_topics, random_state=42)
+    topic_distribution = lda.fit_transform(X)
+
+    topics = pd.Series(topic_distribution.argmax(axis=1), index=present.index).astype("category")
+    return broadcast(topics.reindex(texts.index)), vectorizer, lda
+
+
+def _assign_chunk(vectorizer, lda, texts):
+    return lda.transform(vectorizer.transform(texts)).argmax(axis=1)
+
+
+def assign_topics(texts, vectorizer, lda, n_jobs=-1, chunk_size=20_000):
+    # Transform-only path: no refit, so topic ids stay those of the saved model
+    texts = list(texts)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if len(chunks) <= 1:
+        return _assign_chunk(vectorizer, lda, texts) if texts else np.array([], dtype=int)
+    parts = Parallel(n_jobs=n_jobs)(delayed(_assign_chunk)(vectorizer, lda, chunk) for chunk in chunks)
+    return np.concatenate(parts)
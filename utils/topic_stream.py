@@ -0,0 +1,119 @@
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.decomposition import LatentDirichletAllocation
+
+from utils.sources import dataset_files
+
+# Out-of-core topic modeling: text is streamed from disk in chunks, vectorized with a
+# fixed vocabulary (or hashing) and LDA is trained with partial_fit over several passes.
+# Memory is bounded by the chunk size and the vocabulary, not by the number of rows.
+
+CHUNK_ROWS = 50_000
+MAX_TRACKED_TERMS = 200_000  # Bound on the term counter kept during the scan pass
+
+
+def source_files(path):
+    # The same files the dataset loader reads: one file, a folder of shards or a glob
+    return [Path(f) for f in dataset_files(path)]
+
+
+def file_columns(file):
+    if file.suffix == ".parquet":
+        return pq.ParquetFile(file).schema_arrow.names
+    return pd.read_csv(file, nrows=0).columns.tolist()
+
+
+def source_columns(path):
+    files = source_files(path)
+    return file_columns(files[0]) if files else []
+
+
+def iter_text_chunks(path, column, chunk_rows=CHUNK_ROWS):
+    for file in source_files(path):
+        if column not in file_columns(file):
+            raise ValueError(f"{file} has no column {column!r}")
+        if file.suffix == ".parquet":
+            batches = (b.column(0).to_pandas() for b in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows, columns=[column]))
+        else:
+            batches = (chunk[column] for chunk in pd.read_csv(file, usecols=[column], chunksize=chunk_rows))
+        for texts in batches:
+            texts = texts.dropna().astype(str)
+            if len(texts):
+                yield texts.tolist()
+
+
+class NamedHashingVectorizer(HashingVectorizer):
+    # HashingVectorizer that remembers a readable term for the hash buckets seen while scanning
+    def set_term_names(self, terms):
+        self.term_names_ = {}
+        if terms:
+            X = self.transform(terms).tocsr()
+            for term, start, end in zip(terms, X.indptr[:-1], X.indptr[1:]):
+                if end - start == 1:
+                    self.term_names_.setdefault(int(X.indices[start]), term)  # Most frequent term wins a bucket
+        return self
+
+    def get_feature_names_out(self, input_features=None):
+        names = np.array([f"#{i}" for i in range(self.n_features)], dtype=object)
+        for index, term in getattr(self, "term_names_", {}).items():
+            names[index] = term
+        return names
+
+
+def _count_terms(texts, counter, stop_words):
+    counts = CountVectorizer(stop_words=stop_words)
+    try:
+        X = counts.fit_transform(texts)
+    except ValueError:  # Only stop words / empty documents in this chunk
+        return
+    counter.update(dict(zip(counts.get_feature_names_out(), np.asarray(X.sum(axis=0)).ravel().tolist())))
+    if len(counter) > MAX_TRACKED_TERMS:
+        # Keep the heavy hitters only, so the scan itself stays in bounded memory
+        kept = counter.most_common(MAX_TRACKED_TERMS // 2)
+        counter.clear()
+        counter.update(dict(kept))
+
+
+def fit_topics_out_of_core(path, column, n_topics, passes=2, mode="vocabulary", max_features=1000,
+                           n_features=2**16, stop_words="english", chunk_rows=CHUNK_ROWS, progress=None):
+    # Scan pass: count rows and frequent terms (the vocabulary, or names for hash buckets)
+    counter, n_rows = Counter(), 0
+    for texts in iter_text_chunks(path, column, chunk_rows):
+        _count_terms(texts, counter, stop_words)
+        n_rows += len(texts)
+        if progress:
+            progress("scan", 0, n_rows)
+    if n_rows == 0:
+        raise ValueError(f"No text found in column {column!r} of {path}")
+
+    if mode == "hashing":
+        vectorizer = NamedHashingVectorizer(n_features=n_features, stop_words=stop_words, alternate_sign=False, norm=None)
+        vectorizer.set_term_names([term for term, _ in counter.most_common(max(max_features, 5000))])
+    else:
+        vocabulary = sorted(term for term, _ in counter.most_common(max_features))
+        vectorizer = CountVectorizer(stop_words=stop_words, vocabulary=vocabulary)
+    del counter
+
+    lda = LatentDirichletAllocation(n_components=n_topics, learning_method="online",
+                                    total_samples=n_rows, random_state=42)
+    for current_pass in range(passes):
+        seen = 0
+        for texts in iter_text_chunks(path, column, chunk_rows):
+            lda.partial_fit(vectorizer.transform(texts))
+            seen += len(texts)
+            if progress:
+                progress("train", current_pass, seen / n_rows)
+    return vectorizer, lda, n_rows
+
+
+def topic_counts_out_of_core(path, column, vectorizer, lda, chunk_rows=CHUNK_ROWS):
+    counts = np.zeros(lda.n_components, dtype=np.int64)
+    for texts in iter_text_chunks(path, column, chunk_rows):
+        assigned = lda.transform(vectorizer.transform(texts)).argmax(axis=1)
+        counts += np.bincount(assigned, minlength=lda.n_components)
+    return counts
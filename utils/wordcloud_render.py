@@ -0,0 +1,76 @@
+import io
+
+from joblib import Parallel, delayed
+from wordcloud import WordCloud
+
+from utils.shared_cache import get_shared_cache
+
+# Word clouds rendered straight to PNG bytes (no matplotlib figure) and cached by
+# their frequencies and render settings, so a rerun or a topic switch is a lookup.
+
+DEFAULT_SETTINGS = {"width": 800, "height": 400, "background_color": "white", "colormap": "viridis", "random_state": 42}
+
+
+def _settings(overrides):
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(overrides)
+    return settings
+
+
+def _key(frequencies, settings):
+    return ("wordcloud", tuple(sorted(frequencies.items())), tuple(sorted(settings.items())))
+
+
+def _render(frequencies, settings):
+    cloud = WordCloud(**settings).generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    cloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_wordcloud(frequencies, **overrides):
+    settings = _settings(overrides)
+    frequencies = {str(word): float(freq) for word, freq in frequencies.items() if freq > 0}
+    return get_shared_cache().get_or_compute(_key(frequencies, settings), lambda: _render(frequencies, settings))
+
+
+def prerender_wordclouds(frequencies_by_id, n_jobs=-1, **overrides):
+    # Render every missing cloud in parallel worker processes, then serve all of them from the cache
+    settings = _settings(overrides)
+    cache = get_shared_cache()
+    clouds, missing = {}, {}
+    for cloud_id, frequencies in frequencies_by_id.items():
+        frequencies = {str(word): float(freq) for word, freq in frequencies.items() if freq > 0}
+        png = cache.get(_key(frequencies, settings))
+        if png is None:
+            missing[cloud_id] = frequencies
+        else:
+            clouds[cloud_id] = png
+    if missing:
+        rendered = Parallel(n_jobs=n_jobs)(delayed(_render)(frequencies, settings) for frequencies in missing.values())
+        for (cloud_id, frequencies), png in zip(missing.items(), rendered):
+            clouds[cloud_id] = cache.put(_key(frequencies, settings), png)
+    return clouds
+
+
+def word_counts(text, stopwords=None):
+    # Same tokenisation WordCloud.generate() uses; counts of separate batches add up
+    # (plural folding and two-word phrases are decided within each batch)
+    return WordCloud(stopwords=stopwords).process_text(text)
+
+
+def add_counts(previous, added):
+    counts = dict(previous)
+    for word, count in added.items():
+        counts[word] = counts.get(word, 0) + count
+    return counts
+
+
+def top_frequencies(counts, max_words=200):
+    # The most frequent words, normalised to the most frequent one
+    top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:max_words]
+    if not top:
+        return {}
+    highest = top[0][1]
+    return {word: count / highest for word, count in top}
+